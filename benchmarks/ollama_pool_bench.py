@@ -0,0 +1,186 @@
+"""
+Simulasi OllamaPool terhadap stub server lokal dengan latency yang di-inject.
+
+Setiap stub meniru /api/generate (streaming NDJSON) dan /api/tags.
+Script ini menunjukkan routing ke node tercepat, retry + circuit breaker
+saat node error atau hang, dan hedged request saat node utama lambat.
+Setiap phase punya assertion; dengan --check exit code 1 jika ada yang gagal.
+
+Usage:
+    python -m benchmarks.ollama_pool_bench
+    python -m benchmarks.ollama_pool_bench --check
+    python -m benchmarks.ollama_pool_bench --requests 30 --hedge-delay 0.3
+    python -m benchmarks.ollama_pool_bench --profile profiles/ollama_pool
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config.config import PROFILE_DIR
+from helpers.ollama_pool import OllamaPool
+from helpers.profiler import start_profiler, stop_profiler, profile_turn, profile_stage
+
+
+class StubOllama:
+    """Stub Ollama server dengan TTFT & failure yang bisa diatur saat runtime"""
+
+    def __init__(self, name, ttft, fail=False):
+        self.name = name
+        self.ttft = ttft
+        self.fail = fail
+        self.hits = 0
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                # /api/tags tetap 200 saat generate gagal: hanya circuit breaker yang menahan node
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(b'{"models": []}')
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.hits += 1
+                if stub.fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                try:
+                    time.sleep(stub.ttft)
+                    for word in ("Halo ", "dari ", f"{stub.name}."):
+                        self.wfile.write(json.dumps({"response": word, "done": False}).encode() + b"\n")
+                        self.wfile.flush()
+                        time.sleep(0.01)
+                    self.wfile.write(json.dumps({"response": "", "done": True}).encode() + b"\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/generate"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+
+def run_phase(title, pool, count):
+    print(f"\n=== {title} ===")
+    winners = Counter()
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            with profile_stage("generate"):
+                text = pool.generate({"model": "stub", "prompt": "ping"})
+            winners[text.rsplit(" ", 1)[-1].rstrip(".")] += 1
+        except Exception as e:
+            winners[f"error: {type(e).__name__}"] += 1
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    print(f"   answered by: {dict(winners)}")
+    print(f"   latency p50={latencies[len(latencies) // 2] * 1000:.0f}ms "
+          f"max={latencies[-1] * 1000:.0f}ms")
+    for ep in pool.endpoints:
+        ewma = f"{ep.ttft_ewma * 1000:.0f}ms" if ep.ttft_ewma is not None else "-"
+        print(f"   {ep.url}: healthy={ep.healthy} ewma_ttft={ewma} "
+              f"circuit={'open' if ep.opened_at is not None else 'closed'}")
+    return winners, latencies
+
+
+_failures = []
+
+
+def expect(condition, message):
+    """Assertion per phase: dicatat (bukan raise) supaya semua phase tetap jalan"""
+    print(f"   {'✅' if condition else '❌'} {message}")
+    if not condition:
+        _failures.append(message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OllamaPool simulation with stub servers")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per phase")
+    parser.add_argument("--hedge-delay", type=float, default=0.25, help="Hedge delay (seconds) for last phase")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_DIR, metavar="DIR", help="Sampling profiler output dir")
+    parser.add_argument("--check", action="store_true", help="Exit code 1 jika ada assertion yang gagal")
+    args = parser.parse_args()
+
+    if args.profile:
+        start_profiler(args.profile)
+
+    stubs = [StubOllama("fast", 0.05), StubOllama("medium", 0.2), StubOllama("slow", 0.6)]
+    urls = [stub.url for stub in stubs]
+
+    try:
+        pool = OllamaPool(urls, timeout=5, health_interval=0.5, hedge_delay=0,
+                          failure_threshold=2, cooldown=2)
+        profile_turn(1)
+        winners, _ = run_phase("Latency-aware routing", pool, args.requests)
+        expect(winners.most_common(1)[0][0] == "fast", "fast node answers most requests")
+
+        stubs[0].fail = True
+        hits_before = stubs[0].hits
+        profile_turn(2)
+        winners, latencies = run_phase("Fast node failing, health check ok (retry + circuit breaker)", pool, args.requests)
+        expect(not any(name.startswith("error") for name in winners), "no request fails (retried on next node)")
+        expect(pool.endpoints[0].opened_at is not None, "fast node circuit is open")
+        # Threshold failure sampai circuit open, lalu satu half-open probe per cooldown
+        fast = pool.endpoints[0]
+        max_hits = fast.failure_threshold + int(sum(latencies) / fast.cooldown) + 1
+        expect(stubs[0].hits - hits_before <= max_hits,
+               f"open circuit stops traffic to the failing node ({stubs[0].hits - hits_before} <= {max_hits} hits)")
+
+        stubs[0].fail = False
+        time.sleep(2.5)
+        profile_turn(3)
+        winners, _ = run_phase("Fast node recovered (half-open after cooldown)", pool, args.requests)
+        expect(winners["fast"] >= args.requests // 2, "fast node takes traffic again")
+        expect(pool.endpoints[0].opened_at is None, "fast node circuit is closed")
+
+        stubs[0].ttft = 1.5
+        hedged = OllamaPool(urls, timeout=5, health_interval=0.5, hedge_delay=args.hedge_delay)
+        profile_turn(4)
+        winners, _ = run_phase("Fastest node stalls, no hedging", pool, args.requests // 2)
+        expect(not any(name.startswith("error") for name in winners), "no request fails")
+        profile_turn(5)
+        winners, latencies = run_phase(f"Fastest node stalls, hedge after {args.hedge_delay}s", hedged, args.requests // 2)
+        # Batas: hedge delay + TTFT node medium + overhead stream/HTTP
+        bound = args.hedge_delay + stubs[1].ttft + 0.15
+        expect(latencies[-1] <= bound, f"max latency {latencies[-1] * 1000:.0f}ms <= {bound * 1000:.0f}ms")
+
+        hanging = OllamaPool([stubs[0].url], timeout=0.5, hedge_delay=0, failure_threshold=2, cooldown=5)
+        profile_turn(6)
+        winners, latencies = run_phase("Node hangs past timeout (health check still ok)", hanging, 3)
+        expect(winners["error: TimeoutError"] >= 2, "requests time out")
+        expect(hanging.endpoints[0].opened_at is not None, "timeouts trip the circuit breaker")
+        expect(latencies[-1] <= hanging.timeout + 0.1, f"wait bounded by timeout ({latencies[-1] * 1000:.0f}ms)")
+
+        pool.stop()
+        hedged.stop()
+        hanging.stop()
+    finally:
+        for stub in stubs:
+            stub.close()
+        stop_profiler()
+
+    print(f"\n{'❌ ' + str(len(_failures)) + ' check(s) failed' if _failures else '✅ All checks passed'}")
+    if args.check and _failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
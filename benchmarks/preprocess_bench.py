@@ -0,0 +1,107 @@
+"""
+Benchmark audio preprocessing sebelum Whisper.
+
+Bandingkan durasi input & waktu transcribe Whisper antara audio mentah
+dan audio yang sudah di-trim/normalisasi (helpers.audio_preprocess).
+
+Usage:
+    python -m benchmarks.preprocess_bench recording1.wav recording2.wav ...
+    python -m benchmarks.preprocess_bench --noise-suppression recordings/*.wav
+    python -m benchmarks.preprocess_bench --profile profiles/preprocess recordings/*.wav
+"""
+import argparse
+import time
+
+import numpy as np
+import webrtcvad
+from scipy.io.wavfile import read
+
+from config.config import FRAME_DURATION, VAD_MODE, PROFILE_DIR
+from helpers.audio_preprocess import preprocess_audio
+from helpers.profiler import start_profiler, stop_profiler, profile_turn, profile_stage
+from helpers.stt import transcribe_audio
+
+
+def load_wav(path):
+    """Load WAV sebagai mono int16"""
+    sample_rate, audio_np = read(path)
+    if audio_np.ndim > 1:
+        audio_np = audio_np.mean(axis=1)
+    if audio_np.dtype != np.int16:
+        if np.issubdtype(audio_np.dtype, np.floating):
+            audio_np = audio_np * 32767.0
+        audio_np = np.clip(audio_np, -32768, 32767).astype(np.int16)
+    return sample_rate, audio_np
+
+
+def vad_decisions(audio_np, sample_rate):
+    """VAD per frame, sama seperti record_until_silence"""
+    vad = webrtcvad.Vad(VAD_MODE)
+    frame_samples = int(sample_rate * FRAME_DURATION / 1000)
+    flags = []
+    for start in range(0, len(audio_np) - frame_samples + 1, frame_samples):
+        frame = audio_np[start:start + frame_samples].tobytes()
+        try:
+            flags.append(vad.is_speech(frame, sample_rate))
+        except:
+            flags.append(False)
+    return flags
+
+
+def timed_transcribe(audio_np, sample_rate):
+    start = time.perf_counter()
+    text = transcribe_audio(audio_np, sample_rate)
+    return text, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing sebelum Whisper")
+    parser.add_argument("files", nargs="+", help="WAV files")
+    parser.add_argument("--noise-suppression", action="store_true", help="Aktifkan spectral noise suppression")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_DIR, metavar="DIR", help="Sampling profiler output dir")
+    args = parser.parse_args()
+
+    if args.profile:
+        start_profiler(args.profile)
+
+    totals = {"raw_s": 0.0, "pre_s": 0.0, "raw_t": 0.0, "pre_t": 0.0, "prep_t": 0.0}
+
+    print(f"{'file':<32} {'raw s':>7} {'pre s':>7} {'raw tx':>8} {'pre tx':>8} {'prep ms':>8}")
+    for index, path in enumerate(args.files):
+        profile_turn(index)
+        sample_rate, audio_np = load_wav(path)
+        with profile_stage("vad"):
+            flags = vad_decisions(audio_np, sample_rate)
+
+        start = time.perf_counter()
+        with profile_stage("preprocess"):
+            processed = preprocess_audio(audio_np, flags, sample_rate, args.noise_suppression)
+        prep_t = time.perf_counter() - start
+
+        with profile_stage("whisper_raw"):
+            raw_text, raw_t = timed_transcribe(audio_np, sample_rate)
+        with profile_stage("whisper_pre"):
+            pre_text, pre_t = timed_transcribe(processed, sample_rate)
+
+        raw_s = len(audio_np) / sample_rate
+        pre_s = len(processed) / sample_rate
+        for key, value in (("raw_s", raw_s), ("pre_s", pre_s), ("raw_t", raw_t), ("pre_t", pre_t), ("prep_t", prep_t)):
+            totals[key] += value
+
+        print(f"{path[-32:]:<32} {raw_s:>7.2f} {pre_s:>7.2f} {raw_t:>8.2f} {pre_t:>8.2f} {prep_t * 1000:>8.1f}")
+        print(f"   raw: {raw_text.strip()}")
+        print(f"   pre: {pre_text.strip()}")
+
+    print("=" * 70)
+    if totals["raw_s"] > 0 and totals["raw_t"] > 0:
+        print(f"⏱️  Whisper input: {totals['raw_s']:.2f}s -> {totals['pre_s']:.2f}s "
+              f"({100 * (1 - totals['pre_s'] / totals['raw_s']):.1f}% shorter)")
+        print(f"🧠 Transcribe time: {totals['raw_t']:.2f}s -> {totals['pre_t']:.2f}s "
+              f"({100 * (1 - totals['pre_t'] / totals['raw_t']):.1f}% faster)")
+        print(f"✂️  Preprocessing overhead: {totals['prep_t'] * 1000:.1f} ms total")
+
+    stop_profiler()
+
+
+if __name__ == "__main__":
+    main()
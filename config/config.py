@@ -1,6 +1,12 @@
 import os
 from typing import Final
 
+from dotenv import load_dotenv
+
+# Load .env sebelum get_env apapun: config bisa di-import duluan oleh
+# entry point manapun (main, replay, batch, benchmarks, spawned workers)
+load_dotenv()
+
 def get_env(
     key: str,
     default=None,
@@ -18,16 +24,83 @@ FRAME_DURATION: Final[int] = get_env("FRAME_DURATION", 30, int)  # ms
 SILENCE_TIMEOUT: Final[float] = get_env("SILENCE_TIMEOUT", 1.5, float) # seconds
 VAD_MODE: Final[int] = get_env("VAD_MODE", 2, int)  # 0–3
 
+# ===== CPU Budget =====
+CPU_AUDIO_CORES: Final[int] = get_env("CPU_AUDIO_CORES", 1, int)  # core khusus audio callback
+TORCH_INTRA_THREADS: Final[int] = get_env("TORCH_INTRA_THREADS", 0, int)  # 0 = semua compute core
+TORCH_INTEROP_THREADS: Final[int] = get_env("TORCH_INTEROP_THREADS", 1, int)
+EXECUTOR_WORKERS: Final[int] = get_env("EXECUTOR_WORKERS", 0, int)  # 0 = dari budget
+AUDIO_THREAD_NICE: Final[int] = get_env("AUDIO_THREAD_NICE", 10, int)  # 0 = off (Linux, butuh CAP_SYS_NICE)
+
+# ===== Audio Preprocessing (sebelum Whisper) =====
+TRIM_PADDING_MS: Final[int] = get_env("TRIM_PADDING_MS", 150, int)  # ms di sekitar speech
+NORMALIZE_TARGET_DBFS: Final[float] = get_env("NORMALIZE_TARGET_DBFS", -20.0, float)
+NORMALIZE_MAX_GAIN_DB: Final[float] = get_env("NORMALIZE_MAX_GAIN_DB", 20.0, float)
+NOISE_SUPPRESSION: Final[bool] = get_env(
+    "NOISE_SUPPRESSION",
+    "False",
+    lambda v: v.lower() == "true",
+)
+
 # ===== LLM / Ollama =====
+# Satu URL atau beberapa endpoint dipisah koma (pool dengan latency-aware routing)
 OLLAMA_URL: Final[str] = get_env(
     "OLLAMA_URL",
     "http://localhost:11434/api/generate",
 )
+OLLAMA_URLS: Final[list] = [
+    url.strip() for url in OLLAMA_URL.split(",") if url.strip()
+]
+OLLAMA_TIMEOUT: Final[float] = get_env("OLLAMA_TIMEOUT", 120, float)  # seconds
+OLLAMA_HEALTH_INTERVAL: Final[float] = get_env("OLLAMA_HEALTH_INTERVAL", 10, float)  # seconds
+OLLAMA_EWMA_ALPHA: Final[float] = get_env("OLLAMA_EWMA_ALPHA", 0.3, float)  # bobot TTFT terbaru
+OLLAMA_FAILURE_THRESHOLD: Final[int] = get_env("OLLAMA_FAILURE_THRESHOLD", 3, int)  # circuit breaker
+OLLAMA_CIRCUIT_COOLDOWN: Final[float] = get_env("OLLAMA_CIRCUIT_COOLDOWN", 30, float)  # seconds
+OLLAMA_HEDGE_DELAY: Final[float] = get_env("OLLAMA_HEDGE_DELAY", 0, float)  # seconds, 0 = off
 MODEL_NAME: Final[str] = get_env(
     "MODEL_NAME",
     "qwen2.5:7b",
 )
 
+# ===== Intent Router (jawab command sederhana tanpa LLM) =====
+INTENT_ROUTER: Final[bool] = get_env(
+    "INTENT_ROUTER",
+    "True",
+    lambda v: v.lower() == "true",
+)
+INTENT_CONFIDENCE: Final[float] = get_env("INTENT_CONFIDENCE", 0.75, float)  # 0–1
+
+# ===== TTS =====
+# "auto" = raw PCM pada rate yang cocok dengan output device, fallback ke MP3
+# "mp3"  = selalu MP3 (decode via afplay/mpg123)
+# "pcm_<rate>" = paksa format PCM tertentu (16000/22050/24000/44100/48000)
+TTS_OUTPUT_FORMAT: Final[str] = get_env("TTS_OUTPUT_FORMAT", "auto").lower()
+
+# ===== Filler (acknowledgement audio saat LLM masih berpikir) =====
+FILLER_ENABLED: Final[bool] = get_env(
+    "FILLER_ENABLED",
+    "True",
+    lambda v: v.lower() == "true",
+)
+FILLER_THRESHOLD: Final[float] = get_env("FILLER_THRESHOLD", 1.5, float)  # seconds
+FILLER_FADE_MS: Final[int] = get_env("FILLER_FADE_MS", 80, int)  # fade-out saat reply siap
+FILLER_CACHE_DIR: Final[str] = get_env("FILLER_CACHE_DIR", "cache/filler")
+FILLER_PHRASES: Final[list] = [
+    phrase.strip()
+    for phrase in get_env(
+        "FILLER_PHRASES",
+        "Hmm, sebentar ya.|Oke, aku pikir dulu.|Baik, tunggu sebentar.|Hmm, coba kulihat.",
+    ).split("|")
+    if phrase.strip()
+]
+
+# ===== Turn Capture =====
+# Directory archive untuk turn capture (kosong = off)
+TURN_CAPTURE_DIR: Final[str] = get_env("TURN_CAPTURE_DIR", "")
+
+# ===== Profiling (--profile) =====
+PROFILE_INTERVAL_MS: Final[int] = get_env("PROFILE_INTERVAL_MS", 10, int)  # sampling interval
+PROFILE_DIR: Final[str] = get_env("PROFILE_DIR", "profiles")
+
 # ===== Prompt =====
 ROLE_PROMPT = (
     get_env("ROLE_PROMPT", "")
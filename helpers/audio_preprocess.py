@@ -0,0 +1,158 @@
+import numpy as np
+
+from config.config import (
+    SAMPLE_RATE,
+    FRAME_DURATION,
+    TRIM_PADDING_MS,
+    NORMALIZE_TARGET_DBFS,
+    NORMALIZE_MAX_GAIN_DB,
+    NOISE_SUPPRESSION,
+)
+
+INT16_MAX = 32767.0
+
+
+def trim_silence(audio_np, vad_flags, frame_samples, padding_frames=0):
+    """
+    Potong non-speech di awal & akhir rekaman berdasarkan VAD decisions
+    per frame dari record_until_silence.
+    """
+    if audio_np is None or len(audio_np) == 0 or not vad_flags:
+        return audio_np
+
+    flags = np.asarray(vad_flags, dtype=bool)
+    speech_idx = np.flatnonzero(flags)
+
+    # VAD tidak pernah trigger (misal sample rate tidak didukung) -> jangan trim
+    if len(speech_idx) == 0:
+        return audio_np
+
+    first = max(int(speech_idx[0]) - padding_frames, 0)
+    last = min(int(speech_idx[-1]) + 1 + padding_frames, len(flags))
+
+    return audio_np[first * frame_samples:last * frame_samples]
+
+
+def normalize_gain(audio_np, target_dbfs=NORMALIZE_TARGET_DBFS, max_gain_db=NORMALIZE_MAX_GAIN_DB):
+    """RMS gain normalisation ke target dBFS, dibatasi max gain dan peak (no clipping)"""
+    if audio_np is None or len(audio_np) == 0:
+        return audio_np
+
+    samples = audio_np.astype(np.float32) / INT16_MAX
+    rms = float(np.sqrt(np.mean(np.square(samples))))
+    peak = float(np.max(np.abs(samples)))
+    if rms <= 0.0 or peak <= 0.0:
+        return audio_np
+
+    gain = 10.0 ** (target_dbfs / 20.0) / rms
+    gain = min(gain, 10.0 ** (max_gain_db / 20.0), 0.99 / peak)
+
+    return np.clip(samples * gain * INT16_MAX, -INT16_MAX, INT16_MAX).astype(np.int16)
+
+
+def _frame_signal(samples, n_fft, hop):
+    """Bagi sinyal jadi overlapping frames (view, tanpa copy)"""
+    n_frames = 1 + (len(samples) - n_fft) // hop
+    return np.lib.stride_tricks.as_strided(
+        samples,
+        shape=(n_frames, n_fft),
+        strides=(samples.strides[0] * hop, samples.strides[0]),
+        writeable=False,
+    )
+
+
+def suppress_noise(audio_np, sample_rate=SAMPLE_RATE, noise_mask=None, n_fft=None,
+                   over_subtraction=1.5, floor=0.05):
+    """
+    Spectral subtraction sederhana. Noise profile diambil dari STFT frame yang
+    seluruhnya non-speech menurut noise_mask (boolean per sample, dari VAD);
+    tanpa mask / tidak ada frame noise -> 10% frame dengan energi terendah.
+    """
+    # Default window ~32ms, dibulatkan ke power of two; overlap-add 50% butuh n_fft genap
+    if n_fft is None:
+        n_fft = int(2 ** np.round(np.log2(sample_rate * 0.032)))
+    n_fft += n_fft % 2
+    hop = n_fft // 2
+
+    if audio_np is None or len(audio_np) < n_fft * 2:
+        return audio_np
+
+    window = np.hanning(n_fft + 1)[:-1].astype(np.float32)
+
+    # Pad satu hop di kedua sisi supaya edge tetap tertutup dua window
+    samples = audio_np.astype(np.float32) / INT16_MAX
+    pad = (-len(samples)) % hop
+    samples = np.concatenate([
+        np.zeros(hop, dtype=np.float32),
+        samples,
+        np.zeros(pad + hop, dtype=np.float32),
+    ])
+
+    spectrum = np.fft.rfft(_frame_signal(samples, n_fft, hop) * window, axis=1)
+    magnitude = np.abs(spectrum)
+
+    noise_frames = None
+    if noise_mask is not None:
+        # Frame dihitung noise hanya jika semua sample-nya non-speech (padding = bukan noise)
+        mask = np.zeros(len(samples), dtype=np.uint8)
+        mask[hop:hop + len(audio_np)] = np.asarray(noise_mask[:len(audio_np)], dtype=np.uint8)
+        noise_frames = _frame_signal(mask, n_fft, hop).all(axis=1)
+        if not noise_frames.any():
+            noise_frames = None
+
+    if noise_frames is not None:
+        noise_profile = magnitude[noise_frames].mean(axis=0)
+    else:
+        energy = magnitude.sum(axis=1)
+        n_noise = max(1, len(energy) // 10)
+        noise_profile = magnitude[np.argpartition(energy, n_noise - 1)[:n_noise]].mean(axis=0)
+
+    gain = np.maximum(1.0 - over_subtraction * noise_profile / np.maximum(magnitude, 1e-10), floor)
+    frames = np.fft.irfft(spectrum * gain, n=n_fft, axis=1).astype(np.float32) * window
+
+    # Overlap-add 50%: paruh pertama tiap frame + paruh kedua frame sebelumnya
+    n_frames = len(frames)
+    halves = frames.reshape(n_frames, 2, hop)
+    output = np.zeros((n_frames + 1, hop), dtype=np.float32)
+    output[:-1] += halves[:, 0]
+    output[1:] += halves[:, 1]
+
+    win_sq = (window ** 2).reshape(2, hop)
+    norm = np.zeros((n_frames + 1, hop), dtype=np.float32)
+    norm[:-1] += win_sq[0]
+    norm[1:] += win_sq[1]
+
+    output = (output / np.maximum(norm, 1e-8)).ravel()[hop:hop + len(audio_np)]
+    return np.clip(output * INT16_MAX, -INT16_MAX, INT16_MAX).astype(np.int16)
+
+
+def vad_noise_mask(vad_flags, frame_samples, length):
+    """Boolean per sample: True di frame yang menurut VAD non-speech"""
+    if not vad_flags:
+        return None
+    mask = np.repeat(~np.asarray(vad_flags, dtype=bool), frame_samples)[:length]
+    if len(mask) < length:
+        # Sisa sample setelah frame VAD terakhir tidak diketahui -> bukan noise
+        mask = np.concatenate([mask, np.zeros(length - len(mask), dtype=bool)])
+    return mask
+
+
+def preprocess_audio(audio_np, vad_flags=None, sample_rate=SAMPLE_RATE, noise_suppression=NOISE_SUPPRESSION):
+    """
+    Preprocessing sebelum Whisper:
+    noise suppression (optional, profile dari frame non-speech rekaman utuh)
+    -> trim silence (VAD) -> gain normalisation
+    """
+    if audio_np is None or len(audio_np) == 0:
+        return audio_np
+
+    frame_samples = int(sample_rate * FRAME_DURATION / 1000)
+    padding_frames = int(TRIM_PADDING_MS / FRAME_DURATION)
+
+    if noise_suppression:
+        noise_mask = vad_noise_mask(vad_flags, frame_samples, len(audio_np))
+        audio_np = suppress_noise(audio_np, sample_rate, noise_mask)
+
+    audio_np = trim_silence(audio_np, vad_flags, frame_samples, padding_frames)
+
+    return normalize_gain(audio_np)
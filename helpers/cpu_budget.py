@@ -0,0 +1,205 @@
+import os
+import sys
+import threading
+import time
+
+from config.config import (
+    CPU_AUDIO_CORES,
+    TORCH_INTRA_THREADS,
+    TORCH_INTEROP_THREADS,
+    EXECUTOR_WORKERS,
+    AUDIO_THREAD_NICE,
+)
+
+# ===== CPU budget =====
+_budget = None
+_budget_lock = threading.Lock()
+_applied = False
+
+
+def available_cores():
+    """Core yang boleh dipakai process ini (affinity di Linux, cpu_count di macOS)"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cpu_budget(reserve_audio=True):
+    """
+    Bagi core: CPU_AUDIO_CORES terakhir untuk audio callback,
+    sisanya untuk Whisper/torch, resampling, JSON parsing, dll.
+    reserve_audio=False (batch worker tanpa audio): semua core untuk compute.
+    Dihitung sekali per process, panggilan pertama menentukan.
+    """
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            cores = available_cores()
+            reserve = CPU_AUDIO_CORES if reserve_audio and len(cores) > CPU_AUDIO_CORES else 0
+            audio = cores[len(cores) - reserve:] if reserve else []
+            compute = cores[:len(cores) - reserve] if reserve else cores
+
+            _budget = {
+                "cores": cores,
+                "audio_cores": audio,
+                "compute_cores": compute,
+                "torch_intra": TORCH_INTRA_THREADS or len(compute),
+                "torch_interop": TORCH_INTEROP_THREADS,
+                "executor_workers": EXECUTOR_WORKERS or max(2, min(4, len(compute) // 2)),
+            }
+        return _budget
+
+
+def executor_workers():
+    """Ukuran thread pool _executor sesuai budget"""
+    return cpu_budget()["executor_workers"]
+
+
+def apply_cpu_budget(torch_intra=None, reserve_audio=True):
+    """
+    Set thread count torch dan pin compute thread ke compute cores.
+    Harus dipanggil sebelum Whisper load (thread pool torch mewarisi affinity).
+    """
+    global _applied
+    if _applied:
+        return
+    _applied = True
+
+    budget = cpu_budget(reserve_audio)
+    if torch_intra:
+        budget["torch_intra"] = torch_intra
+
+    import torch
+
+    torch.set_num_threads(budget["torch_intra"])
+    try:
+        torch.set_num_interop_threads(budget["torch_interop"])
+    except RuntimeError:
+        # Sudah ada inter-op work sebelumnya, tidak bisa diubah lagi
+        pass
+
+    # Thread yang dibuat setelah ini (OpenMP, PortAudio) mewarisi affinity compute
+    if budget["audio_cores"] and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, budget["compute_cores"])
+        except OSError as e:
+            print(f"⚠️  CPU affinity warning: {e}")
+
+    print(
+        f"🧮 CPU budget: {len(budget['cores'])} cores -> torch {torch.get_num_threads()} intra / "
+        f"{torch.get_num_interop_threads()} inter-op, audio cores {budget['audio_cores'] or '-'}, "
+        f"executor {budget['executor_workers']} workers"
+    )
+
+
+_audio_thread = threading.local()
+_nice_warned = False
+
+
+def enter_audio_thread():
+    """
+    Panggil di awal audio callback: sekali per thread, pindahkan thread
+    ke audio cores dan naikkan prioritasnya (Linux; di macOS CoreAudio
+    sudah pakai real-time thread).
+    """
+    global _nice_warned
+    if getattr(_audio_thread, "ready", False):
+        return
+    _audio_thread.ready = True
+
+    audio_cores = cpu_budget()["audio_cores"]
+    if audio_cores and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, audio_cores)
+        except OSError:
+            pass
+
+    # Hanya Linux: di sana native thread id = TID yang diterima setpriority
+    # (di macOS get_native_id() adalah Mach thread id, bukan PID)
+    if AUDIO_THREAD_NICE and sys.platform.startswith("linux"):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), -AUDIO_THREAD_NICE)
+        except OSError as e:
+            # Butuh CAP_SYS_NICE / root untuk nice negatif
+            if not _nice_warned:
+                _nice_warned = True
+                print(f"⚠️  Audio thread priority warning (AUDIO_THREAD_NICE={AUDIO_THREAD_NICE}): {e}")
+
+
+def enter_audio_process(pid):
+    """Pindahkan child process audio (mpg123/afplay) ke audio cores (Linux)"""
+    audio_cores = cpu_budget()["audio_cores"]
+    if audio_cores and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(pid, audio_cores)
+        except OSError:
+            pass
+
+
+# ===== Audio callback metrics =====
+class CallbackMetrics:
+    """Hitung callback overrun (callback lebih lama dari durasi block) dan xrun per stream"""
+
+    def __init__(self, name):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        self.callbacks = 0
+        self.overruns = 0
+        self.xruns = 0
+        self.max_load = 0.0
+        self.last_status = ""
+
+    def record_status(self, status):
+        if status:
+            self.xruns += 1
+            self.last_status = str(status).strip()
+
+    def record(self, status, started, frames, sample_rate):
+        """started = time.perf_counter() di awal callback"""
+        self.callbacks += 1
+        self.record_status(status)
+
+        load = (time.perf_counter() - started) / (frames / sample_rate) if frames else 0.0
+        self.max_load = max(self.max_load, load)
+        if load > 1.0:
+            self.overruns += 1
+
+    def snapshot(self):
+        return {
+            "callbacks": self.callbacks,
+            "overruns": self.overruns,
+            "xruns": self.xruns,
+            "max_load": round(self.max_load, 3),
+            "last_status": self.last_status,
+        }
+
+
+_metrics = {}
+
+
+def audio_metrics(name):
+    """CallbackMetrics untuk stream tertentu (input, output, filler)"""
+    if name not in _metrics:
+        _metrics[name] = CallbackMetrics(name)
+    return _metrics[name]
+
+
+def report_audio_metrics(reset=True):
+    """Print ringkasan metrics, return dict (untuk turn capture)"""
+    report = {}
+    for name, metrics in _metrics.items():
+        if not metrics.callbacks and not metrics.xruns:
+            continue
+        report[name] = metrics.snapshot()
+        warn = metrics.overruns or metrics.xruns
+        print(
+            f"{'⚠️ ' if warn else '📈'} Audio {name}: {metrics.callbacks} callbacks, "
+            f"{metrics.overruns} overruns, {metrics.xruns} xruns, "
+            f"max load {metrics.max_load * 100:.0f}%"
+            + (f" ({metrics.last_status})" if metrics.last_status else "")
+        )
+        if reset:
+            metrics.reset()
+    return report
@@ -1,11 +1,13 @@
 
 import os
-from typing import IO
+from typing import IO, Optional
 from io import BytesIO
 from dotenv import load_dotenv
 from elevenlabs import VoiceSettings
 from elevenlabs.client import ElevenLabs
 
+from config.config import TTS_OUTPUT_FORMAT
+
 load_dotenv()
 
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
@@ -14,13 +16,100 @@ elevenlabs = ElevenLabs(
     api_key=ELEVENLABS_API_KEY,
 )
 
+# Request 44.1kHz to match standard system rate (avoids CoreAudio switching glitches)
+MP3_OUTPUT_FORMAT = "mp3_44100_128"
+
+# Raw PCM rates yang disediakan ElevenLabs (16-bit signed little-endian, mono)
+PCM_SAMPLE_RATES = (16000, 22050, 24000, 44100, 48000)
+
+# Format yang ditolak API (misal tier akun tidak mengizinkan pcm_44100),
+# di-skip untuk sisa session supaya tidak bayar round trip gagal tiap turn
+_rejected_formats = set()
+
+
+def is_pcm_format(output_format: str) -> bool:
+    return output_format.startswith("pcm_")
+
+
+def pcm_sample_rate(output_format: str) -> int:
+    """Ambil sample rate dari nama format, misal "pcm_24000" -> 24000"""
+    return int(output_format.split("_", 1)[1])
+
+
+def reject_output_format(output_format: str) -> None:
+    """Tandai format ditolak API; negotiate_output_format turun ke rate PCM berikutnya / MP3"""
+    if output_format not in _rejected_formats:
+        _rejected_formats.add(output_format)
+        print(f"⚠️  TTS format {output_format} rejected, disabled for this session")
+
+
+# Detail error API yang menunjuk ke output format / tier langganan
+_FORMAT_ERROR_HINTS = ("output_format", "output format", "subscription", "tier")
+_NON_FORMAT_ERROR_HINTS = ("quota", "credit", "api_key", "api key", "unauthorized")
+
+
+def is_format_rejection(error: Exception) -> bool:
+    """
+    True hanya jika API menolak output format (misal pcm_44100 di tier yang
+    tidak mengizinkan). Error 4xx lain (API key, quota, teks invalid) hanya
+    menggagalkan turn ini, format tetap dipakai.
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code not in (400, 403, 422):
+        return False
+
+    detail = str(getattr(error, "body", None) or error).lower()
+    if any(hint in detail for hint in _NON_FORMAT_ERROR_HINTS):
+        return False
+    return any(hint in detail for hint in _FORMAT_ERROR_HINTS)
+
+
+def pcm_format_for_rate(device_rate: Optional[float] = None) -> Optional[str]:
+    """
+    PCM format dengan rate sama dengan device (atau rate tertinggi di bawahnya).
+    None jika semua rate PCM sudah ditolak.
+    """
+    allowed = [rate for rate in PCM_SAMPLE_RATES if f"pcm_{rate}" not in _rejected_formats]
+    if not allowed:
+        return None
+    if not device_rate:
+        return f"pcm_{max(allowed)}"
+
+    candidates = [rate for rate in allowed if rate <= device_rate]
+    rate = max(candidates) if candidates else min(allowed)
+    return f"pcm_{rate}"
+
+
+def negotiate_output_format(device_rate: Optional[float] = None) -> str:
+    """
+    Pilih output format TTS berdasarkan TTS_OUTPUT_FORMAT dan rate output device.
+    PCM dipilih pada rate yang sama dengan device (atau rate tertinggi di bawahnya),
+    MP3 hanya sebagai fallback (atau jika semua PCM ditolak).
+    """
+    if TTS_OUTPUT_FORMAT == "mp3":
+        return MP3_OUTPUT_FORMAT
+
+    if is_pcm_format(TTS_OUTPUT_FORMAT):
+        try:
+            if pcm_sample_rate(TTS_OUTPUT_FORMAT) in PCM_SAMPLE_RATES:
+                if TTS_OUTPUT_FORMAT not in _rejected_formats:
+                    return TTS_OUTPUT_FORMAT
+                return pcm_format_for_rate(pcm_sample_rate(TTS_OUTPUT_FORMAT)) or MP3_OUTPUT_FORMAT
+        except ValueError:
+            pass
+        print(f"⚠️  Unsupported TTS_OUTPUT_FORMAT={TTS_OUTPUT_FORMAT}, using auto")
+
+    return pcm_format_for_rate(device_rate) or MP3_OUTPUT_FORMAT
+
 
-def text_to_speech_stream(text: str) -> IO[bytes]:
+def text_to_speech_stream(
+    text: str,
+    output_format: str = MP3_OUTPUT_FORMAT,
+) -> IO[bytes]:
     # Use convert instead of stream for more reliable audio
-    # Request 44.1kHz to match standard system rate (avoids CoreAudio switching glitches)
     response = elevenlabs.text_to_speech.convert(
         voice_id=ELEVENLABS_VOICE_ID,
-        output_format="mp3_44100_128",
+        output_format=output_format,
         text=text,
         model_id="eleven_multilingual_v2",
         voice_settings=VoiceSettings(
@@ -44,7 +133,7 @@ def text_to_speech_stream(text: str) -> IO[bytes]:
 
     # Get total size
     total_size = audio_stream.tell()
-    print(f"   📊 Audio: {chunk_count} chunks, {total_size} bytes")
+    print(f"   📊 Audio ({output_format}): {chunk_count} chunks, {total_size} bytes")
     
     if total_size < 100:
         print(f"   ⚠️  WARNING: Audio file very small ({total_size} bytes)!")
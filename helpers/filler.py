@@ -0,0 +1,234 @@
+import hashlib
+import os
+import random
+import threading
+import time
+
+import numpy as np
+import sounddevice as sd
+
+from config.config import (
+    FILLER_CACHE_DIR,
+    FILLER_FADE_MS,
+    FILLER_PHRASES,
+)
+from helpers.turn_archive import capture
+from helpers.cpu_budget import enter_audio_thread, audio_metrics
+
+
+class FillerPlayer:
+    """
+    Player untuk acknowledgement clip pendek di OutputStream sendiri,
+    supaya bisa di-fade-out bersih saat audio reply siap.
+    """
+
+    def __init__(self):
+        self.stream = None
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+        self.buffer = None
+        self.position = 0
+        self.fade_length = None
+        self.fade_position = 0
+        self.metrics = audio_metrics("filler")
+
+    def play(self, samples, sample_rate, volume=1.0):
+        self.stop(fade_ms=0)
+
+        with self.lock:
+            self.buffer = samples.astype(np.float32) * (volume / 32768.0)
+            self.position = 0
+            self.fade_length = None
+            self.fade_position = 0
+            self.sample_rate = sample_rate
+            self.finished.clear()
+
+            self.stream = sd.OutputStream(
+                samplerate=sample_rate,
+                channels=1,
+                dtype="float32",
+                callback=self._callback,
+                finished_callback=self.finished.set,
+            )
+            self.stream.start()
+
+    def _callback(self, outdata, frames, time_info, status):
+        started = time.perf_counter()
+        enter_audio_thread()
+        chunk = self.buffer[self.position:self.position + frames]
+        self.position += len(chunk)
+
+        if self.fade_length is not None:
+            # Linear fade-out mulai dari posisi fade saat ini
+            ramp = 1.0 - (self.fade_position + np.arange(len(chunk), dtype=np.float32)) / self.fade_length
+            chunk = chunk * np.clip(ramp, 0.0, 1.0)
+            self.fade_position += len(chunk)
+            if self.fade_position >= self.fade_length:
+                self.position = len(self.buffer)
+
+        outdata[:len(chunk), 0] = chunk
+        outdata[len(chunk):] = 0
+        self.metrics.record(status, started, frames, self.sample_rate)
+
+        if self.position >= len(self.buffer):
+            raise sd.CallbackStop
+
+    def stop(self, fade_ms=FILLER_FADE_MS):
+        """Fade-out (atau cut jika fade_ms=0) lalu tutup stream"""
+        with self.lock:
+            if self.stream is None:
+                return
+            try:
+                if fade_ms > 0 and not self.finished.is_set():
+                    self.fade_length = max(1, int(self.sample_rate * fade_ms / 1000))
+                    self.finished.wait(timeout=fade_ms / 1000 + 0.5)
+                self.stream.abort()
+                self.stream.close()
+            except Exception as e:
+                print(f"⚠️  Filler stop warning: {e}")
+            finally:
+                self.stream = None
+
+
+class FillerBank:
+    """Pool clip filler pre-rendered (PCM) di disk, dipilih tanpa pengulangan berturut"""
+
+    def __init__(self, phrases=FILLER_PHRASES, cache_dir=FILLER_CACHE_DIR):
+        self.phrases = list(phrases)
+        self.cache_dir = cache_dir
+        self.clips = []  # (phrase, samples, sample_rate)
+        self._bag = []
+        self._last = None
+
+    def _cache_path(self, phrase, output_format, voice_id):
+        key = hashlib.sha1(f"{voice_id}|{output_format}|{phrase}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{key}_{output_format}.pcm")
+
+    def prepare(self, output_format):
+        """
+        Load clip dari cache, render via ElevenLabs jika belum ada.
+        Return False jika format ditolak API (caller turun ke rate berikutnya).
+        """
+        from helpers.elevenlabs_tts import (
+            ELEVENLABS_VOICE_ID,
+            is_format_rejection,
+            pcm_sample_rate,
+            reject_output_format,
+            text_to_speech_stream,
+        )
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        sample_rate = pcm_sample_rate(output_format)
+        clips = []
+
+        for phrase in self.phrases:
+            path = self._cache_path(phrase, output_format, ELEVENLABS_VOICE_ID)
+            try:
+                if not os.path.exists(path):
+                    print(f"🎼 Rendering filler: {phrase}")
+                    data = text_to_speech_stream(phrase, output_format=output_format).read()
+                    data = data[:len(data) - len(data) % 2]
+                    with open(path + ".tmp", "wb") as f:
+                        f.write(data)
+                    os.replace(path + ".tmp", path)
+                clips.append((phrase, np.fromfile(path, dtype="<i2"), sample_rate))
+            except Exception as e:
+                if is_format_rejection(e):
+                    reject_output_format(output_format)
+                    return False
+                print(f"⚠️  Filler '{phrase}' unavailable: {e}")
+
+        self.clips = clips
+        print(f"✅ Filler ready: {len(clips)} clips")
+        return True
+
+    def pick(self):
+        """Shuffle bag: semua clip terpakai dulu sebelum ada yang diulang"""
+        if not self.clips:
+            return None
+        if not self._bag:
+            self._bag = list(range(len(self.clips)))
+            random.shuffle(self._bag)
+            # Hindari clip yang sama dua kali berturut-turut antar bag
+            if len(self._bag) > 1 and self._bag[-1] == self._last:
+                self._bag[0], self._bag[-1] = self._bag[-1], self._bag[0]
+        self._last = self._bag.pop()
+        return self.clips[self._last]
+
+
+# Global instances
+_filler_bank = FillerBank()
+_filler_player = FillerPlayer()
+
+# Time-to-first-audio state untuk turn yang sedang berjalan
+_wait_started = None
+_filler_started = None
+
+
+def prepare_fillers():
+    """Pre-render / load filler clips (panggil sekali di background)"""
+    from helpers.elevenlabs_tts import pcm_format_for_rate
+    from helpers.tts import get_output_device_rate
+
+    try:
+        device_rate = get_output_device_rate()
+        output_format = pcm_format_for_rate(device_rate)
+        while output_format and not _filler_bank.prepare(output_format):
+            output_format = pcm_format_for_rate(device_rate)
+    except Exception as e:
+        print(f"⚠️  Filler prepare failed: {e}")
+
+
+def begin_wait():
+    """Mulai hitung time-to-first-audio (saat LLM mulai berpikir)"""
+    global _wait_started, _filler_started
+    _wait_started = time.perf_counter()
+    _filler_started = None
+
+
+def play_filler(volume=1.0):
+    """Putar acknowledgement clip (non-blocking)"""
+    global _filler_started
+    clip = _filler_bank.pick()
+    if clip is None:
+        return False
+
+    phrase, samples, sample_rate = clip
+    try:
+        _filler_player.play(samples, sample_rate, volume)
+    except Exception as e:
+        print(f"⚠️  Filler playback error: {e}")
+        return False
+
+    _filler_started = time.perf_counter()
+    print(f"🎼 Filler: {phrase}")
+    return True
+
+
+def stop_filler():
+    """Stop filler tanpa log (misal LLM error)"""
+    global _wait_started, _filler_started
+    _filler_player.stop()
+    _wait_started = None
+    _filler_started = None
+
+
+def on_reply_audio():
+    """Dipanggil tepat sebelum audio reply diputar: stop filler & log time-to-first-audio"""
+    global _wait_started, _filler_started
+    _filler_player.stop()
+
+    if _wait_started is None:
+        return
+
+    reply_ttfa = time.perf_counter() - _wait_started
+    if _filler_started is not None:
+        filler_ttfa = _filler_started - _wait_started
+        print(f"⏱️  Time-to-first-audio: {filler_ttfa:.2f}s (filler), reply {reply_ttfa:.2f}s")
+        capture(ttfa=filler_ttfa, ttfa_reply=reply_ttfa, filler=True)
+    else:
+        print(f"⏱️  Time-to-first-audio: {reply_ttfa:.2f}s (no filler)")
+        capture(ttfa=reply_ttfa, ttfa_reply=reply_ttfa, filler=False)
+
+    _wait_started = None
+    _filler_started = None
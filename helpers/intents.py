@@ -0,0 +1,181 @@
+import re
+import time
+from datetime import datetime
+
+from config.config import INTENT_CONFIDENCE
+
+# Kata pengisi yang tidak dihitung saat menghitung confidence
+_FILLER_WORDS = (
+    "tolong", "dong", "ya", "yah", "deh", "sih", "coba", "please", "zeta",
+    "hei", "hey", "halo", "eh", "tapi", "aja", "saja", "sekarang", "now",
+    "dulu", "kak",
+)
+# Match yang didahului negasi ("jangan berhenti") tidak dihitung
+_NEGATION_WORDS = frozenset((
+    "jangan", "tidak", "tak", "gak", "ga", "nggak", "enggak", "bukan", "belum", "don", "dont", "not",
+))
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+_HARI = ("Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu")
+_BULAN = (
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember",
+)
+
+
+def normalize_text(text):
+    """Lowercase, buang tanda baca & spasi berlebih"""
+    text = _NON_WORD_RE.sub(" ", text.lower())
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+class IntentResult:
+    """Hasil intent lokal: reply untuk TTS dan apakah percakapan lanjut"""
+
+    def __init__(self, name, confidence, reply="", keep_running=True, repeat=False):
+        self.name = name
+        self.confidence = confidence
+        self.reply = reply
+        self.keep_running = keep_running
+        self.repeat = repeat  # putar ulang audio jawaban terakhir
+
+
+class IntentRouter:
+    """
+    Intent router sebelum LLM.
+    Semua pattern digabung jadi satu precompiled regex; confidence = porsi
+    kata transcript (tanpa filler) yang tertutup match intent tersebut.
+    Di bawah threshold, atau match didahului negasi -> LLM.
+    """
+
+    def __init__(self, threshold=INTENT_CONFIDENCE):
+        self.threshold = threshold
+        self.intents = []  # (name, patterns, handler)
+        self._matcher = None
+
+    def register(self, name, patterns, handler):
+        """handler(match, context) -> dict (reply, keep_running, repeat) atau None untuk skip"""
+        self.intents.append((name, tuple(patterns), handler))
+        self._matcher = None
+
+    def _compile(self):
+        groups = [
+            f"(?P<i{index}>{'|'.join(patterns)})"
+            for index, (_, patterns, _) in enumerate(self.intents)
+        ]
+        self._matcher = re.compile(r"\b(?:" + "|".join(groups) + r")\b")
+
+    def match(self, text):
+        """Return (index, match, confidence) atau None"""
+        if not self.intents:
+            return None
+        if self._matcher is None:
+            self._compile()
+
+        words = [word for word in normalize_text(text).split() if word not in _FILLER_WORDS]
+        if not words:
+            return None
+        core = " ".join(words)
+
+        # Kata yang tertutup match per intent (match berulang, misal "stop stop", dijumlah)
+        covered = {}
+        first_match = {}
+        for match in self._matcher.finditer(core):
+            previous = core[:match.start()].split()[-1:]
+            if previous and previous[0] in _NEGATION_WORDS:
+                continue
+            index = int(match.lastgroup[1:])
+            covered[index] = covered.get(index, 0) + len(match.group(0).split())
+            first_match.setdefault(index, match)
+
+        if not covered:
+            return None
+        index = max(covered, key=covered.get)
+        return index, first_match[index], covered[index] / len(words)
+
+    def route(self, text, context=None):
+        """IntentResult jika intent lokal cocok (>= threshold), selain itu None (-> LLM)"""
+        found = self.match(text)
+        if found is None or found[2] < self.threshold:
+            return None
+
+        index, match, confidence = found
+        name, _, handler = self.intents[index]
+        result = handler(match, context or {})
+        if result is None:
+            return None
+        return IntentResult(name, confidence, **result)
+
+
+# ===== Built-in handlers =====
+def _handle_exit(match, context):
+    return {"reply": "Sampai jumpa!", "keep_running": False}
+
+
+def _handle_cancel(match, context):
+    return {"reply": ""}
+
+
+def _handle_time(match, context):
+    now = datetime.now()
+    return {"reply": f"Sekarang jam {now.hour:02d}.{now.minute:02d}."}
+
+
+def _handle_date(match, context):
+    now = datetime.now()
+    return {"reply": f"Hari ini {_HARI[now.weekday()]}, {now.day} {_BULAN[now.month - 1]} {now.year}."}
+
+
+def _handle_volume(match, context):
+    from helpers.tts import get_volume, set_volume
+
+    text = match.group(0)
+    louder = any(word in text for word in ("naik", "besar", "keras", "tambah", "up", "louder"))
+    if "terlalu" in text:
+        # "terlalu keras" -> kecilkan, "terlalu pelan" -> besarkan
+        louder = not louder
+    volume = set_volume(get_volume() * (1.25 if louder else 0.8))
+    return {"reply": f"Volume {round(volume * 100)} persen."}
+
+
+def _handle_repeat(match, context):
+    last_reply = context.get("last_reply")
+    if not last_reply:
+        return {"reply": "Belum ada jawaban untuk diulang."}
+    return {"reply": last_reply, "repeat": True}
+
+
+# Global router instance (built-in intents, bisa ditambah via register_intent)
+_router = IntentRouter()
+_router.register("exit", [r"berhenti", r"keluar", r"selesai", r"exit", r"quit", r"stop"], _handle_exit)
+_router.register("cancel", [r"batal(?:kan)?", r"(?:ga|gak|nggak|tidak) jadi", r"cancel", r"never ?mind"], _handle_cancel)
+_router.register("time", [r"jam berapa", r"pukul berapa", r"what time is it"], _handle_time)
+_router.register("date", [r"(?:hari ini )?tanggal berapa(?: hari ini)?", r"hari apa(?: hari ini| ini)?", r"what day is (?:it|today)"], _handle_date)
+_router.register(
+    "volume",
+    [
+        r"volume(?:nya)? (?:naik(?:kan)?|turun(?:kan)?|(?:di)?besar(?:kan)?|(?:di)?kecil(?:kan)?|up|down)",
+        r"(?:naik(?:kan)?|turun(?:kan)?|besar(?:kan)?|kecil(?:kan)?|tambah|kurang(?:i)?) (?:volume|suara)(?:nya)?",
+        r"(?:suara(?:nya)? )?(?:lebih|terlalu) (?:keras|pelan)",
+        r"turn (?:it |the volume )?(?:up|down)",
+        r"louder", r"quieter",
+    ],
+    _handle_volume,
+)
+_router.register("repeat", [r"ulang(?:i|in)?(?: lagi)?", r"apa tadi", r"repeat(?: that)?", r"say that again"], _handle_repeat)
+
+
+def register_intent(name, patterns, handler):
+    """Tambah intent lokal (pattern regex atas transcript yang sudah dinormalisasi)"""
+    _router.register(name, patterns, handler)
+
+
+def route_intent(text, context=None):
+    """Coba jawab transcript secara lokal; None -> lanjut ke LLM"""
+    start = time.perf_counter()
+    result = _router.route(text, context)
+    if result is not None:
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"⚡ Intent: {result.name} (confidence {result.confidence:.2f}, {elapsed:.1f} ms)")
+    return result
@@ -1,9 +1,13 @@
-import requests
 from config.config import (
-    OLLAMA_URL,
     MODEL_NAME,
     ROLE_PROMPT,
 )
+from helpers.ollama_pool import OllamaPool
+from helpers.turn_archive import capture
+
+# Global pool instance (health check thread start saat request pertama)
+_ollama_pool = OllamaPool()
+
 
 def ask_llm(user_text):
     prompt = f"""
@@ -15,13 +19,12 @@ def ask_llm(user_text):
     Assistant:
     """
 
-    response = requests.post(
-        OLLAMA_URL,
-        json={
-            "model": MODEL_NAME,
-            "prompt": prompt,
-            "stream": False
-        },
-        timeout=120
-    )
-    return response.json()["response"]
\ No newline at end of file
+    payload = {
+        "model": MODEL_NAME,
+        "prompt": prompt,
+    }
+    capture(llm_request=payload)
+
+    answer = _ollama_pool.generate(payload)
+    capture(llm_response=answer)
+    return answer
@@ -0,0 +1,270 @@
+import json
+import queue
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+from config.config import (
+    OLLAMA_URLS,
+    OLLAMA_TIMEOUT,
+    OLLAMA_HEALTH_INTERVAL,
+    OLLAMA_EWMA_ALPHA,
+    OLLAMA_FAILURE_THRESHOLD,
+    OLLAMA_CIRCUIT_COOLDOWN,
+    OLLAMA_HEDGE_DELAY,
+)
+
+
+class OllamaEndpoint:
+    """Satu node Ollama: health state, EWMA time-to-first-token, circuit breaker"""
+
+    def __init__(self, url, ewma_alpha=OLLAMA_EWMA_ALPHA,
+                 failure_threshold=OLLAMA_FAILURE_THRESHOLD, cooldown=OLLAMA_CIRCUIT_COOLDOWN):
+        self.url = url
+        parts = urlsplit(url)
+        self.health_url = f"{parts.scheme}://{parts.netloc}/api/tags"
+
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.healthy = True
+        self.ttft_ewma = None
+        self.failures = 0
+        self.opened_at = None  # circuit open sejak kapan (None = closed)
+        self.lock = threading.Lock()
+
+    def is_available(self):
+        """Closed circuit, atau half-open setelah cooldown lewat"""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            return time.monotonic() - self.opened_at >= self.cooldown
+
+    def score(self):
+        """Makin kecil makin cepat; node tanpa data dicoba dulu"""
+        with self.lock:
+            return self.ttft_ewma if self.ttft_ewma is not None else 0.0
+
+    def _update_ewma(self, ttft):
+        if self.ttft_ewma is None:
+            self.ttft_ewma = ttft
+        else:
+            self.ttft_ewma = self.ewma_alpha * ttft + (1 - self.ewma_alpha) * self.ttft_ewma
+
+    def record_slow(self, elapsed):
+        """Request dibatalkan (kalah hedge) sebelum first token: TTFT minimal = elapsed"""
+        with self.lock:
+            self._update_ewma(max(elapsed, self.ttft_ewma or 0.0))
+
+    def record_success(self, ttft):
+        with self.lock:
+            self._update_ewma(ttft)
+            self.failures = 0
+            self.opened_at = None
+            self.healthy = True
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    print(f"⚠️  Circuit open: {self.url}")
+                self.opened_at = time.monotonic()
+
+    def check_health(self, timeout=2.0):
+        try:
+            response = requests.get(self.health_url, timeout=timeout)
+            healthy = response.status_code == 200
+        except requests.RequestException:
+            healthy = False
+
+        with self.lock:
+            if healthy != self.healthy:
+                print(f"{'✅' if healthy else '⚠️ '} Ollama {'healthy' if healthy else 'unhealthy'}: {self.url}")
+            self.healthy = healthy
+        return healthy
+
+
+class _Attempt:
+    """Satu streaming request ke satu endpoint (jalan di thread sendiri)"""
+
+    def __init__(self, endpoint, payload, timeout, events):
+        self.endpoint = endpoint
+        self.payload = payload
+        self.timeout = timeout
+        self.events = events
+        self.cancelled = threading.Event()
+        self.first_sent = False
+        self.chunks = []
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self.thread.start()
+
+    def cancel(self):
+        """Kalah hedge: update EWMA dengan elapsed (attempt yang sudah error tidak dihitung lagi)"""
+        if not self.cancelled.is_set() and not self.first_sent and self.error is None:
+            self.endpoint.record_slow(time.monotonic() - self.started_at)
+        self.cancelled.set()
+
+    def abandon(self):
+        """Timeout sebelum first token: hitung sebagai failure supaya node yang hang tetap trip breaker"""
+        if not self.cancelled.is_set() and not self.first_sent and self.error is None:
+            self.endpoint.record_failure()
+        self.cancelled.set()
+
+    def text(self):
+        return "".join(self.chunks)
+
+    def _run(self):
+        try:
+            with requests.post(
+                self.endpoint.url,
+                json={**self.payload, "stream": True},
+                timeout=self.timeout,
+                stream=True,
+            ) as response:
+                response.raise_for_status()
+
+                for line in response.iter_lines():
+                    if self.cancelled.is_set():
+                        return
+                    if not line:
+                        continue
+
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise RuntimeError(chunk["error"])
+
+                    token = chunk.get("response", "")
+                    if token:
+                        self.chunks.append(token)
+
+                    if not self.first_sent and (token or chunk.get("done")):
+                        self.first_sent = True
+                        self.endpoint.record_success(time.monotonic() - self.started_at)
+                        self.events.put(("first", self))
+
+                    if chunk.get("done"):
+                        break
+
+            if not self.first_sent:
+                raise RuntimeError("Stream ended without response")
+
+        except Exception as e:
+            if self.cancelled.is_set():
+                return
+            self.error = e
+            if not self.first_sent:
+                self.endpoint.record_failure()
+                self.events.put(("error", self))
+
+
+class OllamaPool:
+    """
+    Pool beberapa endpoint Ollama:
+    background health check, routing ke node dengan EWMA TTFT terkecil,
+    retry ke node berikutnya, circuit breaker, dan optional hedged request.
+    """
+
+    def __init__(self, urls=OLLAMA_URLS, timeout=OLLAMA_TIMEOUT,
+                 health_interval=OLLAMA_HEALTH_INTERVAL, hedge_delay=OLLAMA_HEDGE_DELAY, **endpoint_kwargs):
+        if not urls:
+            raise ValueError("OllamaPool butuh minimal satu endpoint")
+
+        self.endpoints = [OllamaEndpoint(url, **endpoint_kwargs) for url in urls]
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self.hedge_delay = hedge_delay
+
+        self._stop = threading.Event()
+        self._health_thread = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """Start background health check (idempotent, single endpoint tidak perlu)"""
+        with self._start_lock:
+            if self._health_thread is not None or len(self.endpoints) < 2 or self.health_interval <= 0:
+                return
+            self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+            self._health_thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _health_loop(self):
+        while not self._stop.is_set():
+            for endpoint in self.endpoints:
+                endpoint.check_health()
+            self._stop.wait(self.health_interval)
+
+    def ranked(self):
+        """Endpoint yang bisa dipakai, tercepat duluan"""
+        candidates = [ep for ep in self.endpoints if ep.healthy and ep.is_available()]
+        if not candidates:
+            # Semua unhealthy/open: tetap coba yang circuit-nya boleh, lalu semua
+            candidates = [ep for ep in self.endpoints if ep.is_available()] or list(self.endpoints)
+        return sorted(candidates, key=lambda ep: ep.score())
+
+    def generate(self, payload):
+        """Kirim request ke node tercepat; return full response text"""
+        self.start()
+
+        pending = self.ranked()
+        events = queue.Queue()
+        attempts = []
+
+        def launch():
+            attempt = _Attempt(pending.pop(0), payload, self.timeout, events)
+            attempts.append(attempt)
+            attempt.start()
+
+        launch()
+        live = 1
+        winner = None
+        # Satu deadline untuk seluruh request (retry & hedge tidak memperpanjang timeout)
+        deadline = time.monotonic() + self.timeout
+
+        while winner is None:
+            remaining = deadline - time.monotonic()
+            hedge = self.hedge_delay > 0 and bool(pending) and remaining > self.hedge_delay
+            try:
+                if remaining <= 0:
+                    raise queue.Empty
+                kind, attempt = events.get(timeout=self.hedge_delay if hedge else remaining)
+            except queue.Empty:
+                if hedge:
+                    print(f"   🔀 Hedging to {pending[0].url}")
+                    launch()
+                    live += 1
+                    continue
+                for attempt in attempts:
+                    attempt.abandon()
+                raise TimeoutError(f"Ollama tidak merespon dalam {self.timeout}s")
+
+            if kind == "first":
+                winner = attempt
+                break
+
+            # Error sebelum first token: retry ke node berikutnya
+            live -= 1
+            print(f"⚠️  Ollama error ({attempt.endpoint.url}): {attempt.error}")
+            if pending:
+                launch()
+                live += 1
+            elif live == 0:
+                raise attempt.error
+
+        for attempt in attempts:
+            if attempt is not winner:
+                attempt.cancel()
+
+        winner.thread.join()
+        if winner.error is not None:
+            raise winner.error
+        return winner.text()
@@ -0,0 +1,178 @@
+import os
+import sys
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from config.config import PROFILE_INTERVAL_MS
+
+IDLE_STAGE = "idle"
+
+# Leaf frame (file, function) thread yang sedang blocking/menunggu, bukan pakai CPU:
+# Event/Condition/queue/future wait, idle executor worker, socket read, subprocess wait.
+# Sama seperti default py-spy, sample dengan leaf ini di-skip (time.sleep tidak terdeteksi).
+IDLE_LEAF_FRAMES = frozenset({
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("selectors.py", "select"),
+    ("socket.py", "readinto"),
+    ("socket.py", "accept"),
+    ("ssl.py", "read"),
+    ("ssl.py", "recv_into"),
+    ("subprocess.py", "_try_wait"),
+    ("subprocess.py", "_wait"),
+    ("connection.py", "_recv"),
+})
+
+
+class SamplingProfiler:
+    """
+    Low-overhead sampling profiler.
+    Thread background mengambil stack semua thread tiap PROFILE_INTERVAL_MS,
+    tag dengan pipeline stage & turn yang aktif, lalu tulis collapsed stacks
+    (format flamegraph.pl / speedscope) per stage dan per turn.
+    Thread yang sedang menunggu (IDLE_LEAF_FRAMES) di-skip kecuali include_idle=True.
+    """
+
+    def __init__(self, output_dir, interval_ms=PROFILE_INTERVAL_MS, include_idle=False):
+        self.output_dir = output_dir
+        self.interval = interval_ms / 1000.0
+        self.include_idle = include_idle
+        self.idle_samples = 0
+
+        # (turn, stage) -> Counter(collapsed stack -> samples)
+        self.samples = defaultdict(Counter)
+        self.stage_stack = []
+        self.turn = None
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # ===== Tagging =====
+    def push_stage(self, stage):
+        with self._lock:
+            self.stage_stack.append(stage)
+
+    def pop_stage(self):
+        with self._lock:
+            if self.stage_stack:
+                self.stage_stack.pop()
+
+    def set_turn(self, turn):
+        with self._lock:
+            self.turn = turn
+
+    def current_tag(self):
+        with self._lock:
+            return self.turn, "/".join(self.stage_stack) or IDLE_STAGE
+
+    # ===== Sampling =====
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        print(f"🔬 Profiler on ({self.interval * 1000:.0f}ms) -> {self.output_dir}")
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            tag = self.current_tag()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if not self.include_idle and self._is_idle(frame):
+                    self.idle_samples += 1
+                    continue
+                self.samples[tag][self._collapse(frame, names.get(thread_id, thread_id))] += 1
+
+    @staticmethod
+    def _is_idle(frame):
+        code = frame.f_code
+        return (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAF_FRAMES
+
+    @staticmethod
+    def _collapse(frame, thread_name):
+        """Frame -> "thread;outer;...;inner" (root duluan)"""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.append(str(thread_name))
+        return ";".join(reversed(stack))
+
+    # ===== Output =====
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        self.write()
+
+    def write(self):
+        """Tulis <stage>.folded (semua turn) dan turn-<n>/<stage>.folded"""
+        per_stage = defaultdict(Counter)
+        for (turn, stage), stacks in list(self.samples.items()):
+            per_stage[stage].update(stacks)
+            if turn is not None:
+                self._write_folded(os.path.join(self.output_dir, f"turn-{turn}"), stage, stacks)
+
+        for stage, stacks in per_stage.items():
+            self._write_folded(self.output_dir, stage, stacks)
+
+        total = sum(sum(stacks.values()) for stacks in per_stage.values())
+        print(f"🔬 Profile: {total} samples ({self.idle_samples} idle skipped), "
+              f"{len(per_stage)} stages -> {self.output_dir}")
+
+    @staticmethod
+    def _write_folded(directory, stage, stacks):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{stage.replace('/', '.')}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# Global profiler (None = profiling off)
+_profiler = None
+
+
+def start_profiler(output_dir, interval_ms=PROFILE_INTERVAL_MS):
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler(output_dir, interval_ms)
+        _profiler.start()
+    return _profiler
+
+
+def stop_profiler():
+    global _profiler
+    if _profiler is not None:
+        _profiler.stop()
+        _profiler = None
+
+
+def profile_turn(turn):
+    """Tag sample berikutnya dengan nomor turn"""
+    if _profiler:
+        _profiler.set_turn(turn)
+
+
+@contextmanager
+def profile_stage(stage):
+    """Tag sample selama block ini dengan pipeline stage (nested -> "stt/whisper")"""
+    profiler = _profiler
+    if profiler is None:
+        yield
+        return
+    profiler.push_stage(stage)
+    try:
+        yield
+    finally:
+        profiler.pop_stage()
@@ -1,38 +1,41 @@
-import warnings
 import os
 import gc
 import threading
 import time
 
-DEBUG_MODE = os.getenv("DEBUG_MODE", "False").lower()
-WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small")
-if DEBUG_MODE == "false":
-    warnings.filterwarnings("ignore")
+# Import duluan: whisper_backend set warnings filter sebelum load whisper
+from helpers.whisper_backend import load_whisper_model, transcribe
 
-import whisper
 import sounddevice as sd
 import numpy as np
 import webrtcvad
 import queue
 from scipy.io.wavfile import write
 import tempfile
+from contextlib import contextmanager
 
 from config.config import (
     SAMPLE_RATE,
     FRAME_DURATION,
     SILENCE_TIMEOUT,
     VAD_MODE,
-    WHISPER_TRANSCRIBE_PROMPT,
 )
+from helpers.audio_preprocess import preprocess_audio
+from helpers.turn_archive import capture, capture_stage
+from helpers.profiler import profile_stage
+from helpers.cpu_budget import enter_audio_thread, audio_metrics
 
 # ===== GLOBAL STATE =====
 # Load model ONCE (shared memory)
-_whisper_model = whisper.load_model(WHISPER_MODEL, device="cpu")
+_whisper_model = load_whisper_model()
 print("✅ Whisper loaded!")
 
 # Thread-safe recorder
 _recorder_lock = threading.Lock()
 
+# Durasi per stage STT dari panggilan speech_to_text terakhir
+_stt_timings = {}
+
 
 class AudioRecorder:
     """Thread-safe audio recorder dengan VAD"""
@@ -41,12 +44,15 @@ class AudioRecorder:
         self.vad = webrtcvad.Vad(VAD_MODE)
         self.audio_queue = queue.Queue()
         self.stream = None
+        self.vad_flags = []  # VAD decision per frame dari rekaman terakhir
+        self.metrics = audio_metrics("input")
         
     def audio_callback(self, indata, frames, time_info, status):
-        """Callback untuk audio stream"""
-        if status:
-            print(f"⚠️  Audio status: {status}")
+        """Callback untuk audio stream (tanpa print: status dihitung ke metrics)"""
+        started = time.perf_counter()
+        enter_audio_thread()
         self.audio_queue.put(bytes(indata))
+        self.metrics.record(status, started, frames, SAMPLE_RATE)
     
     def find_input_device(self):
         """Cari input device yang tersedia"""
@@ -91,6 +97,7 @@ class AudioRecorder:
             )
             
             frames = []
+            self.vad_flags = []
             silence_frames = 0
             max_silence_frames = int(SILENCE_TIMEOUT * 1000 / FRAME_DURATION)
             speech_detected = False
@@ -109,12 +116,14 @@ class AudioRecorder:
                     # VAD check
                     try:
                         is_speech = self.vad.is_speech(frame, SAMPLE_RATE)
+                        self.vad_flags.append(is_speech)
                         if is_speech:
                             silence_frames = 0
                             speech_detected = True
                         else:
                             silence_frames += 1
                     except:
+                        self.vad_flags.append(False)
                         silence_frames += 1
                     
                     # Check silence timeout
@@ -163,49 +172,25 @@ def record_audio():
         return _recorder.record_until_silence()
 
 
-def speech_to_text():
-    """Convert speech to text menggunakan Whisper"""
-    
-    # Record audio
-    audio_np = record_audio()
-    
-    if audio_np is None or len(audio_np) == 0:
-        print("⚠️  No audio recorded")
-        return ""
+def get_vad_flags():
+    """VAD decisions per frame dari rekaman terakhir"""
+    with _recorder_lock:
+        return list(_recorder.vad_flags)
+
+
+def transcribe_audio(audio_np, sample_rate=SAMPLE_RATE, model=None):
+    """Transcribe int16 audio dengan Whisper (prompt & settings yang sama untuk semua caller)"""
+    model = model or _whisper_model
     
     # Save to temp file untuk Whisper
     temp_path = None
     try:
         with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            write(f.name, SAMPLE_RATE, audio_np)
+            write(f.name, sample_rate, audio_np)
             temp_path = f.name
         
-        # Whisper transcribe
-        
-        prompt = (
-            WHISPER_TRANSCRIBE_PROMPT
-        )
+        return transcribe(model, temp_path)
         
-        print("🧠 Transcribing...") 
-        
-        result = _whisper_model.transcribe(
-            temp_path,
-            language="id",
-            initial_prompt=prompt,
-            task="transcribe",
-            temperature=0.0,
-            best_of=3,
-            beam_size=3,
-            condition_on_previous_text=False,
-            word_timestamps=False,
-            fp16=False,
-        )
-        
-        return result["text"]
-        
-    except Exception as e:
-        print(f"❌ Transcription error: {e}")
-        return ""
     finally:
         # Cleanup temp file
         if temp_path and os.path.exists(temp_path):
@@ -213,7 +198,63 @@ def speech_to_text():
                 os.remove(temp_path)
             except:
                 pass
+
+
+@contextmanager
+def _stt_stage(stage):
+    """Timing stage STT: turn capture ("stt/<stage>"), profiler dan get_stt_timings"""
+    start = time.perf_counter()
+    try:
+        with capture_stage(f"stt/{stage}"), profile_stage(stage):
+            yield
+    finally:
+        _stt_timings[f"stt/{stage}"] = time.perf_counter() - start
+
+
+def get_stt_timings():
+    """Durasi record / preprocess / whisper dari speech_to_text terakhir"""
+    return dict(_stt_timings)
+
+
+def speech_to_text(audio_np=None, vad_flags=None, sample_rate=SAMPLE_RATE):
+    """
+    Convert speech to text menggunakan Whisper.
+    Tanpa argumen: record dari mic. Dengan audio_np (+ vad_flags, sample_rate):
+    replay audio yang sudah ada pada sample rate aslinya.
+    """
+    _stt_timings.clear()
+    
+    # Record audio
+    if audio_np is None:
+        with _stt_stage("record"):
+            audio_np = record_audio()
+        vad_flags = get_vad_flags()
+        sample_rate = SAMPLE_RATE
+    
+    if audio_np is None or len(audio_np) == 0:
+        print("⚠️  No audio recorded")
+        return ""
+    
+    capture(audio=audio_np, vad_flags=vad_flags, sample_rate=sample_rate)
+    
+    try:
+        # Trim silence, normalisasi gain, (optional) noise suppression
+        raw_duration = len(audio_np) / sample_rate
+        with _stt_stage("preprocess"):
+            audio_np = preprocess_audio(audio_np, vad_flags, sample_rate)
+        print(f"✂️  Preprocessed: {raw_duration:.2f}s -> {len(audio_np) / sample_rate:.2f}s")
+        
+        print("🧠 Transcribing...") 
         
+        with _stt_stage("whisper"):
+            text = transcribe_audio(audio_np, sample_rate)
+        capture(transcript=text)
+        return text
+        
+    except Exception as e:
+        print(f"❌ Transcription error: {e}")
+        return ""
+    finally:
         # CRITICAL: Full audio cleanup after Whisper
         print("🔄 Final audio cleanup after STT...")
         sd.stop()
@@ -4,13 +4,73 @@ import os
 import subprocess
 import tempfile
 
-from helpers.elevenlabs_tts import text_to_speech_stream
+import numpy as np
+import sounddevice as sd
+
+from helpers.elevenlabs_tts import (
+    text_to_speech_stream,
+    negotiate_output_format,
+    is_pcm_format,
+    is_format_rejection,
+    reject_output_format,
+    pcm_sample_rate,
+    MP3_OUTPUT_FORMAT,
+)
+from helpers.turn_archive import capture
+from helpers.profiler import profile_stage
+from helpers.filler import on_reply_audio
+from helpers.cpu_budget import audio_metrics, enter_audio_thread, enter_audio_process
+
+# Playback volume (1.0 = normal), diatur lewat intent "volume"
+MAX_VOLUME = 2.0
+_volume = 1.0
+
+# Audio PCM terakhir (samples, sample_rate) untuk intent "repeat"
+_last_audio = None
+
+
+def get_volume():
+    return _volume
+
+
+def set_volume(volume):
+    """Set playback volume (0.05–MAX_VOLUME), return volume yang dipakai"""
+    global _volume
+    _volume = min(max(volume, 0.05), MAX_VOLUME)
+    return _volume
+
+
+def player_command(audio_path, use_afplay):
+    """afplay (macOS) atau mpg123 (Linux/Docker), dengan volume saat ini"""
+    if use_afplay:
+        return ["afplay", "-v", f"{_volume:.2f}", audio_path]
+    # -q = quiet, -f = output scale (default 32768)
+    return ["mpg123", "-q", "-f", str(int(32768 * _volume)), audio_path]
+
+
+def run_player(player_cmd, timeout=60):
+    """subprocess.run untuk afplay/mpg123, dengan process dipindah ke audio cores"""
+    process = subprocess.Popen(player_cmd)
+    enter_audio_process(process.pid)
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        raise
+    return subprocess.CompletedProcess(player_cmd, process.returncode)
+
 
 # Thread-safe audio player
 class AudioPlayer:
     def __init__(self):
         self.is_playing = False
         self.play_lock = threading.Lock()
+        self.buffer = None
+        self.position = 0
+        self.sample_rate = None
+        self.finished = threading.Event()
+        self.metrics = audio_metrics("output")
         
     def play_audio_file(self, audio_path):
         """Play audio file menggunakan afplay (macOS) atau mpg123 (Linux/Docker)"""
@@ -27,20 +87,12 @@ class AudioPlayer:
                 except:
                     pass
                 
-                if use_afplay:
-                    player_cmd = ["afplay", audio_path]
-                    print(f"   🔊 afplay: {audio_path}")
-                else:
-                    # Fallback to mpg123 (standard on Linux/Docker)
-                    # -q = quiet
-                    player_cmd = ["mpg123", "-q", audio_path]
-                    print(f"   🔊 mpg123: {audio_path}")
+                # Fallback to mpg123 (standard on Linux/Docker)
+                player_cmd = player_command(audio_path, use_afplay)
+                print(f"   🔊 {player_cmd[0]}: {audio_path}")
                 
                 # IMPORTANT: Don't capture output, let it play naturally
-                result = subprocess.run(
-                    player_cmd,
-                    timeout=60
-                )
+                result = run_player(player_cmd, timeout=60)
                 
                 self.is_playing = False
                 
@@ -59,6 +111,55 @@ class AudioPlayer:
             self.is_playing = False
             return False
     
+    def play_pcm(self, samples, sample_rate):
+        """
+        Play raw PCM (int16 NumPy buffer) langsung ke output device, tanpa decode.
+        Lewat OutputStream callback (bukan sd.play) supaya callback thread
+        pindah ke audio cores dan overrun/xrun tercatat per block.
+        """
+        try:
+            with self.play_lock:
+                self.is_playing = True
+                print(f"   🔊 sounddevice: {len(samples)} samples @ {sample_rate} Hz")
+                if _volume != 1.0:
+                    samples = np.clip(samples * _volume, -32768, 32767).astype(np.int16)
+                
+                self.buffer = samples
+                self.position = 0
+                self.sample_rate = sample_rate
+                self.finished.clear()
+                
+                with sd.OutputStream(
+                    samplerate=sample_rate,
+                    channels=1,
+                    dtype="int16",
+                    callback=self._pcm_callback,
+                    finished_callback=self.finished.set,
+                ):
+                    if not self.finished.wait(timeout=len(samples) / sample_rate + 5.0):
+                        print("⚠️  Playback timeout")
+                
+                self.is_playing = False
+                return True
+                
+        except Exception as e:
+            print(f"❌ PCM playback error: {e}")
+            self.is_playing = False
+            return False
+    
+    def _pcm_callback(self, outdata, frames, time_info, status):
+        started = time.perf_counter()
+        enter_audio_thread()
+        chunk = self.buffer[self.position:self.position + frames]
+        self.position += len(chunk)
+        
+        outdata[:len(chunk), 0] = chunk
+        outdata[len(chunk):] = 0
+        self.metrics.record(status, started, frames, self.sample_rate)
+        
+        if self.position >= len(self.buffer):
+            raise sd.CallbackStop
+    
     def wait_if_playing(self):
         """Wait jika sedang playing"""
         while self.is_playing:
@@ -74,6 +175,8 @@ def text_to_speech_direct(text):
     Direct TTS dengan proper device management.
     Wait longer after download untuk ensure device ready.
     """
+    global _last_audio
+    _last_audio = None  # MP3 tidak disimpan untuk replay
     print("🎧 TTS start (direct mode)")
     
     # Wait jika masih ada audio playing
@@ -82,7 +185,8 @@ def text_to_speech_direct(text):
     # Download audio
     print("📥 Downloading...")
     try:
-        audio_stream = text_to_speech_stream(text)
+        with profile_stage("download"):
+            audio_stream = text_to_speech_stream(text)
         audio_stream.seek(0)
         audio_data = audio_stream.read()
         
@@ -91,6 +195,7 @@ def text_to_speech_direct(text):
             return False
             
         print(f"   ✅ Downloaded: {len(audio_data)} bytes")
+        capture(tts_format=MP3_OUTPUT_FORMAT, tts_audio=audio_data)
         
     except Exception as e:
         print(f"❌ Download failed: {e}")
@@ -125,16 +230,12 @@ def text_to_speech_direct(text):
         except:
             pass
             
-        if use_afplay:
-            player_cmd = ["afplay", temp_path]
-        else:
-            player_cmd = ["mpg123", "-q", temp_path]
+        player_cmd = player_command(temp_path, use_afplay)
         
         # Play audio
-        result = subprocess.run(
-            player_cmd,
-            timeout=60
-        )
+        on_reply_audio()
+        with profile_stage("play_mp3"):
+            result = run_player(player_cmd, timeout=60)
         
         if result.returncode == 0:
             print("✅ TTS complete")
@@ -145,8 +246,8 @@ def text_to_speech_direct(text):
             # Fallback for afplay only
             if use_afplay:
                 print("🔄 Trying with explicit default device...")
-                result2 = subprocess.run(
-                    ["afplay", "-q", "1", temp_path],
+                result2 = run_player(
+                    ["afplay", "-q", "1", "-v", f"{_volume:.2f}", temp_path],
                     timeout=60
                 )
                 
@@ -169,11 +270,119 @@ def text_to_speech_direct(text):
                 pass
 
 
+def get_output_device_rate():
+    """Default sample rate dari output device (None jika tidak diketahui)"""
+    try:
+        device = sd.query_devices(kind="output")
+        return float(device.get("default_samplerate", 0)) or None
+    except Exception:
+        return None
+
+
+def resample_pcm(samples, sample_rate, target_rate):
+    """Linear-interpolation resample int16 PCM (upsample ke rate device)"""
+    if not target_rate or int(target_rate) == sample_rate or len(samples) == 0:
+        return samples, sample_rate
+    target_rate = int(target_rate)
+    length = int(round(len(samples) * target_rate / sample_rate))
+    positions = np.arange(length) * (sample_rate / target_rate)
+    resampled = np.interp(positions, np.arange(len(samples)), samples.astype(np.float32))
+    return np.clip(resampled, -32768, 32767).astype(np.int16), target_rate
+
+
+def text_to_speech_pcm(text, output_format, device_rate=None):
+    """
+    TTS raw PCM: download int16 PCM dan kirim langsung ke output device
+    sebagai NumPy buffer (skip MP3 encode/decode).
+    Jika rate PCM tidak sama dengan device, resample lokal ke rate device.
+    """
+    global _last_audio
+    print(f"🎧 TTS start (PCM mode, {output_format})")
+    
+    # Wait jika masih ada audio playing
+    _audio_player.wait_if_playing()
+    
+    # Download audio
+    print("📥 Downloading...")
+    try:
+        with profile_stage("download"):
+            audio_stream = text_to_speech_stream(text, output_format=output_format)
+        audio_stream.seek(0)
+        audio_data = audio_stream.read()
+        
+        if len(audio_data) < 100:
+            print(f"❌ Audio too small: {len(audio_data)} bytes")
+            return False
+        
+        # 16-bit samples, buang byte terakhir jika jumlahnya ganjil
+        usable = len(audio_data) - (len(audio_data) % 2)
+        samples = np.frombuffer(audio_data[:usable], dtype="<i2")
+        sample_rate = pcm_sample_rate(output_format)
+        
+        duration = len(samples) / sample_rate
+        print(f"   ✅ Downloaded: {len(audio_data)} bytes ({duration:.2f}s)")
+        capture(tts_format=output_format, tts_audio=audio_data)
+        
+    except Exception as e:
+        print(f"❌ Download failed: {e}")
+        if is_format_rejection(e):
+            reject_output_format(output_format)
+        return False
+    
+    if device_rate and int(device_rate) != sample_rate:
+        samples, sample_rate = resample_pcm(samples, sample_rate, device_rate)
+        print(f"   🔁 Resampled to {sample_rate} Hz")
+    
+    _last_audio = (samples, sample_rate)
+    
+    # CRITICAL: Wait before playing
+    print("   ⏳ Waiting for audio system to stabilize...")
+    time.sleep(0.8)
+    
+    print(f"▶️  Playing audio...")
+    on_reply_audio()
+    with profile_stage("play_pcm"):
+        played = _audio_player.play_pcm(samples, sample_rate)
+    
+    if played:
+        print("✅ TTS complete")
+        return True
+    return False
+
+
+def replay_last_audio():
+    """Putar ulang audio PCM terakhir tanpa request TTS baru"""
+    if _last_audio is None:
+        return False
+    
+    _audio_player.wait_if_playing()
+    samples, sample_rate = _last_audio
+    print("🔁 Replaying last audio...")
+    with profile_stage("play_pcm"):
+        return _audio_player.play_pcm(samples, sample_rate)
+
+
 def text_to_speech(text):
     """
     Main TTS function.
-    Gunakan direct mode untuk performa terbaik.
+    Raw PCM dulu (rate sesuai output device), MP3 direct mode sebagai fallback.
+    Format yang ditolak API diingat per session: turun ke rate PCM berikutnya,
+    lalu MP3, tanpa mengulang round trip yang gagal di turn berikutnya.
     """
+    capture(tts_text=text)
+    device_rate = get_output_device_rate()
+    output_format = negotiate_output_format(device_rate)
+    tried = set()
+    
+    while is_pcm_format(output_format) and output_format not in tried:
+        tried.add(output_format)
+        if text_to_speech_pcm(text, output_format, device_rate):
+            return True
+        output_format = negotiate_output_format(device_rate)
+        if output_format in tried:
+            break
+        print(f"🔄 PCM failed, falling back to {output_format}...")
+    
     return text_to_speech_direct(text)
 
 
@@ -0,0 +1,199 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from config.config import TURN_CAPTURE_DIR
+
+SEGMENT_FILE = "turns.seg"
+INDEX_FILE = "turns.idx"
+
+# Index record (fixed size, little-endian):
+# turn_id, timestamp, lalu (offset, length) untuk meta, audio, vad, tts
+_INDEX_STRUCT = struct.Struct("<QdQIQIQIQI")
+_BLOBS = ("meta", "audio", "vad", "tts")
+
+
+class TurnArchive:
+    """
+    Append-only archive untuk turn capture.
+    Data mentah masuk ke segment file, index fixed-size ditulis terakhir
+    (commit point) supaya bisa di-mmap dan diakses random per turn.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.segment_path = os.path.join(directory, SEGMENT_FILE)
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self.lock = threading.Lock()
+
+    # ===== Write =====
+    def append(self, turn):
+        """Simpan satu turn (dict dari TurnRecorder), return turn_id"""
+        audio = turn.pop("audio", None)
+        vad_flags = turn.pop("vad_flags", None)
+        tts_audio = turn.pop("tts_audio", None)
+
+        blobs = {
+            "meta": json.dumps(turn, ensure_ascii=False, default=str).encode("utf-8"),
+            "audio": np.asarray(audio, dtype="<i2").tobytes() if audio is not None else b"",
+            "vad": np.asarray(vad_flags, dtype=np.uint8).tobytes() if vad_flags else b"",
+            "tts": bytes(tts_audio) if tts_audio is not None else b"",
+        }
+
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+
+            # Record index yang terpotong (crash saat append) dibuang dulu,
+            # supaya record baru tetap aligned
+            index_size = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+            turn_id = index_size // _INDEX_STRUCT.size
+            if index_size % _INDEX_STRUCT.size:
+                with open(self.index_path, "r+b") as idx:
+                    idx.truncate(turn_id * _INDEX_STRUCT.size)
+
+            locations = []
+            with open(self.segment_path, "ab") as seg:
+                offset = seg.tell()
+                for name in _BLOBS:
+                    seg.write(blobs[name])
+                    locations.extend((offset, len(blobs[name])))
+                    offset += len(blobs[name])
+                seg.flush()
+                os.fsync(seg.fileno())
+
+            with open(self.index_path, "ab") as idx:
+                idx.write(_INDEX_STRUCT.pack(turn_id, turn.get("timestamp", time.time()), *locations))
+                idx.flush()
+                os.fsync(idx.fileno())
+
+        return turn_id
+
+    # ===== Read =====
+    def __len__(self):
+        try:
+            return os.path.getsize(self.index_path) // _INDEX_STRUCT.size
+        except OSError:
+            return 0
+
+    @contextmanager
+    def _mapped(self):
+        with open(self.index_path, "rb") as idx, open(self.segment_path, "rb") as seg:
+            index_map = mmap.mmap(idx.fileno(), 0, access=mmap.ACCESS_READ)
+            segment_map = mmap.mmap(seg.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(self.segment_path) else b""
+            try:
+                yield index_map, segment_map
+            finally:
+                index_map.close()
+                if segment_map:
+                    segment_map.close()
+
+    @staticmethod
+    def _blob(index_map, segment_map, turn_id, name):
+        """Bytes satu blob (meta/audio/vad/tts) dari turn tertentu"""
+        record = _INDEX_STRUCT.unpack_from(index_map, turn_id * _INDEX_STRUCT.size)
+        position = 2 + 2 * _BLOBS.index(name)
+        offset, length = record[position], record[position + 1]
+        return bytes(segment_map[offset:offset + length])
+
+    def read(self, turn_id):
+        """Load satu turn: meta + audio (int16), vad flags, tts bytes"""
+        if not 0 <= turn_id < len(self):
+            raise IndexError(f"Turn {turn_id} tidak ada di archive ({len(self)} turns)")
+
+        with self._mapped() as (index_map, segment_map):
+            def blob(name):
+                return self._blob(index_map, segment_map, turn_id, name)
+
+            turn = json.loads(blob("meta").decode("utf-8"))
+            turn["turn_id"] = turn_id
+            turn["audio"] = np.frombuffer(blob("audio"), dtype="<i2")
+            turn["vad_flags"] = np.frombuffer(blob("vad"), dtype=np.uint8).astype(bool).tolist()
+            turn["tts_audio"] = blob("tts")
+            return turn
+
+    def list(self):
+        """(turn_id, timestamp, transcript) untuk semua turn, hanya baca index + meta blob"""
+        count = len(self)
+        if not count:
+            return []
+
+        turns = []
+        with self._mapped() as (index_map, segment_map):
+            for turn_id in range(count):
+                meta = json.loads(self._blob(index_map, segment_map, turn_id, "meta").decode("utf-8"))
+                turns.append((turn_id, meta.get("timestamp"), meta.get("transcript", "")))
+        return turns
+
+
+class TurnRecorder:
+    """Kumpulkan data satu turn dari STT/LLM/TTS, lalu simpan ke archive"""
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.current = None
+        self.lock = threading.Lock()
+
+    def begin_turn(self, cycle_num=None):
+        with self.lock:
+            self.current = {"timestamp": time.time(), "cycle": cycle_num, "timings": {}}
+
+    def capture(self, **fields):
+        with self.lock:
+            if self.current is not None:
+                self.current.update(fields)
+
+    def add_timing(self, stage, seconds):
+        with self.lock:
+            if self.current is not None:
+                self.current["timings"][stage] = seconds
+
+    def end_turn(self):
+        with self.lock:
+            turn, self.current = self.current, None
+        if turn is None:
+            return None
+        try:
+            turn_id = self.archive.append(turn)
+            print(f"💾 Turn captured: #{turn_id} ({self.archive.directory})")
+            return turn_id
+        except Exception as e:
+            print(f"⚠️  Turn capture failed: {e}")
+            return None
+
+
+# Global recorder (None = capture off)
+_turn_recorder = TurnRecorder(TurnArchive(TURN_CAPTURE_DIR)) if TURN_CAPTURE_DIR else None
+
+
+def begin_turn(cycle_num=None):
+    if _turn_recorder:
+        _turn_recorder.begin_turn(cycle_num)
+
+
+def capture(**fields):
+    """Tambahkan data ke turn yang sedang direkam (no-op jika capture off)"""
+    if _turn_recorder:
+        _turn_recorder.capture(**fields)
+
+
+def end_turn():
+    if _turn_recorder:
+        return _turn_recorder.end_turn()
+    return None
+
+
+@contextmanager
+def capture_stage(stage):
+    """Catat durasi stage ke turn yang sedang direkam"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if _turn_recorder:
+            _turn_recorder.add_timing(stage, time.perf_counter() - start)
@@ -0,0 +1,42 @@
+import warnings
+import os
+
+# Import duluan: config load .env sebelum os.getenv di bawah
+from config.config import WHISPER_TRANSCRIBE_PROMPT
+
+DEBUG_MODE = os.getenv("DEBUG_MODE", "False").lower()
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small")
+if DEBUG_MODE == "false":
+    warnings.filterwarnings("ignore")
+
+import whisper
+
+from helpers.cpu_budget import apply_cpu_budget
+
+# Settings Whisper yang sama untuk live STT, benchmark dan batch transcription
+TRANSCRIBE_OPTIONS = {
+    "language": "id",
+    "task": "transcribe",
+    "temperature": 0.0,
+    "best_of": 3,
+    "beam_size": 3,
+    "condition_on_previous_text": False,
+    "word_timestamps": False,
+    "fp16": False,
+}
+
+
+def load_whisper_model(name=WHISPER_MODEL):
+    """Load Whisper model di CPU (thread count sesuai CPU budget)"""
+    apply_cpu_budget()
+    return whisper.load_model(name, device="cpu")
+
+
+def transcribe(model, audio):
+    """Transcribe path file atau float32 array 16kHz, return text"""
+    result = model.transcribe(
+        audio,
+        initial_prompt=WHISPER_TRANSCRIBE_PROMPT,
+        **TRANSCRIBE_OPTIONS,
+    )
+    return result["text"]
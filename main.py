@@ -1,20 +1,28 @@
+import argparse
 import time
 import signal
 import sys
 import gc
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 
-from helpers.tts import text_to_speech, reset_audio
+from helpers.tts import text_to_speech, reset_audio, replay_last_audio, get_volume
 from helpers.llm import ask_llm
 from helpers.stt import speech_to_text, cleanup_audio
+from helpers.turn_archive import begin_turn, end_turn, capture, capture_stage
+from helpers.profiler import start_profiler, stop_profiler, profile_turn, profile_stage
+from helpers.intents import route_intent
+from helpers.filler import prepare_fillers, begin_wait, play_filler, stop_filler
+from helpers.cpu_budget import executor_workers, report_audio_metrics
+from config.config import PROFILE_DIR, INTENT_ROUTER, FILLER_ENABLED, FILLER_THRESHOLD
 
 # ===== GLOBAL STATE =====
 running = True
 space_pressed = False
 keyboard_listener = None
+last_reply = None  # untuk intent "repeat"
 
 # Thread pool untuk async operations
-_executor = ThreadPoolExecutor(max_workers=2)
+_executor = ThreadPoolExecutor(max_workers=executor_workers())
 
 
 def signal_handler(sig, frame):
@@ -34,6 +42,7 @@ def signal_handler(sig, frame):
     
     cleanup_audio()
     reset_audio()
+    stop_profiler()
     
     print("👋 Bye!")
     sys.exit(0)
@@ -140,8 +149,55 @@ def wait_for_enter():
         return False
 
 
+def prepare_reply(answer):
+    """Prepare reply (ambil kalimat pertama untuk TTS)"""
+    reply = answer.strip().split("\n")[0]
+    return reply.replace(".", "... ")
+
+
+def ask_llm_with_filler(text):
+    """
+    ask_llm di background; jika belum selesai dalam FILLER_THRESHOLD,
+    putar acknowledgement clip sambil menunggu.
+    """
+    begin_wait()
+    future = _executor.submit(ask_llm, text)
+    
+    if not FILLER_ENABLED:
+        return future.result()
+    
+    try:
+        return future.result(timeout=FILLER_THRESHOLD)
+    except FutureTimeout:
+        play_filler(get_volume())
+        return future.result()
+
+
+def answer_intent(intent):
+    """Jawab intent lokal langsung ke TTS (tanpa LLM)"""
+    global last_reply
+    capture(intent=intent.name)
+    
+    if intent.reply:
+        print(f"\n💬 Zeta says:")
+        print(f"   {intent.reply}")
+        
+        print("\n🔊 Speaking...")
+        with capture_stage("tts"), profile_stage("tts"):
+            if not (intent.repeat and replay_last_audio()):
+                text_to_speech(intent.reply)
+        
+        if not intent.repeat:
+            last_reply = intent.reply
+    
+    return intent.keep_running
+
+
 def conversation_cycle(cycle_num):
     """Single conversation cycle with PROPER device management"""
+    global last_reply
+    begin_turn(cycle_num)
+    profile_turn(cycle_num)
     try:
         print(f"\n{'='*70}")
         print(f"💬 Percakapan #{cycle_num}")
@@ -149,7 +205,8 @@ def conversation_cycle(cycle_num):
         
         # === 1. STT ===
         print("\n🎤 [1/3] Listening...")
-        text = speech_to_text()
+        with capture_stage("stt"), profile_stage("stt"):
+            text = speech_to_text()
         
         if not text or not text.strip():
             print("⚠️  No audio detected")
@@ -157,10 +214,13 @@ def conversation_cycle(cycle_num):
         
         print(f"📝 You: {text}")
         
-        # Check exit command
-        # if any(w in text.lower() for w in ["berhenti", "keluar", "stop", "exit", "selesai"]):
-        #     print("\n👋 Bye!")
-        #     return False
+        # Local intents (stop, jam, volume, ulangi, ...) tanpa LLM
+        intent = route_intent(text, {"last_reply": last_reply}) if INTENT_ROUTER else None
+        if intent is not None:
+            should_continue = answer_intent(intent)
+            if not should_continue:
+                print("\n👋 Bye!")
+            return should_continue
         
         # CRITICAL: Extra wait after STT to ensure device fully released
         print("\n⏳ Ensuring audio devices are fully released...")
@@ -168,14 +228,14 @@ def conversation_cycle(cycle_num):
         
         # === 2. LLM ===
         print("\n🧠 [2/3] Thinking...")
-        answer = ask_llm(text)
+        with capture_stage("llm"), profile_stage("llm"):
+            answer = ask_llm_with_filler(text)
         
         print(f"\n💬 Zeta says:")
         print(f"   {answer}")
         
-        # Prepare reply (ambil kalimat pertama untuk TTS)
-        reply = answer.strip().split("\n")[0]
-        reply = reply.replace(".", "... ")
+        reply = prepare_reply(answer)
+        last_reply = reply
         
         # CRITICAL: Extra wait before TTS
         print("\n⏳ Preparing audio output...")
@@ -183,7 +243,8 @@ def conversation_cycle(cycle_num):
         
         # === 3. TTS ===
         print("\n🔊 [3/3] Speaking...")
-        tts_success = text_to_speech(reply)
+        with capture_stage("tts"), profile_stage("tts"):
+            tts_success = text_to_speech(reply)
         
         if not tts_success:
             print("⚠️  TTS failed, but continuing...")
@@ -218,6 +279,11 @@ def conversation_cycle(cycle_num):
         
         time.sleep(1.0)
         return True
+    finally:
+        stop_filler()
+        capture(audio_metrics=report_audio_metrics())
+        end_turn()
+        profile_turn(None)
 
 
 def main_loop():
@@ -232,6 +298,10 @@ def main_loop():
     
     print("✨ AsistenQue ready!\n")
     
+    # Pre-render filler clips di background (cached di disk)
+    if FILLER_ENABLED:
+        _executor.submit(prepare_fillers)
+    
     # Initial cleanup
     try:
         cleanup_audio()
@@ -290,11 +360,28 @@ def main_loop():
         _executor.shutdown(wait=True, cancel_futures=True)
     except:
         pass
+    stop_profiler()
     
     print("👋 Thanks!")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="AsistenQue - Voice Assistant")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=PROFILE_DIR,
+        metavar="DIR",
+        help=f"Sampling profiler, collapsed stacks per stage & turn (default dir: {PROFILE_DIR})",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.profile:
+        start_profiler(args.profile)
+    
     try:
         main_loop()
     except Exception as e:
@@ -304,6 +391,7 @@ if __name__ == "__main__":
             reset_audio()
             gc.collect()
             _executor.shutdown(wait=False)
+            stop_profiler()
         except:
             pass
         sys.exit(1)
@@ -0,0 +1,117 @@
+"""
+Replay turn dari turn capture archive (TURN_CAPTURE_DIR).
+
+Audio yang diarsipkan dimasukkan lagi ke speech_to_text, ask_llm dan TTS
+supaya regresi bisa direproduksi, lalu stage timing dibandingkan dengan
+timing aslinya.
+
+Usage:
+    python replay.py list [--dir captures/]
+    python replay.py show 3
+    python replay.py replay 3 [--no-speak] [--archived-transcript]
+"""
+import argparse
+import sys
+import time
+
+from config.config import TURN_CAPTURE_DIR, SAMPLE_RATE
+from helpers.turn_archive import TurnArchive
+
+
+def cmd_list(archive, args):
+    for turn_id, timestamp, transcript in archive.list():
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+        print(f"#{turn_id:<5} {when}  {(transcript or '').strip()[:60]}")
+
+
+def cmd_show(archive, args):
+    turn = archive.read(args.turn_id)
+    sample_rate = turn.get("sample_rate") or 1
+    speech = sum(turn["vad_flags"])
+    print(f"💬 Turn #{turn['turn_id']} (cycle {turn.get('cycle')})")
+    print(f"   🎤 Audio: {len(turn['audio']) / sample_rate:.2f}s @ {sample_rate} Hz, "
+          f"VAD speech {speech}/{len(turn['vad_flags'])} frames")
+    print(f"   📝 Transcript: {turn.get('transcript', '')}")
+    print(f"   💬 LLM: {turn.get('llm_response', '')}")
+    print(f"   🔊 TTS: {len(turn['tts_audio'])} bytes ({turn.get('tts_format', '-')})")
+    for stage, seconds in turn.get("timings", {}).items():
+        print(f"   ⏱️  {stage}: {seconds:.2f}s")
+
+
+def cmd_replay(archive, args):
+    turn = archive.read(args.turn_id)
+    archived_timings = turn.get("timings", {})
+    timings = {}
+
+    # Import di sini: load Whisper/ElevenLabs hanya saat replay
+    from helpers.stt import speech_to_text, get_stt_timings
+    from helpers.llm import ask_llm
+    from helpers.tts import text_to_speech
+    from main import prepare_reply
+
+    print(f"🔁 Replaying turn #{turn['turn_id']}")
+
+    if args.archived_transcript:
+        text = turn.get("transcript", "")
+    else:
+        # Sample rate dari archive, bukan SAMPLE_RATE config saat ini
+        sample_rate = turn.get("sample_rate") or SAMPLE_RATE
+        text = speech_to_text(turn["audio"], turn["vad_flags"], sample_rate)
+        # Bandingkan per stage: timing "stt" asli termasuk waktu rekam mic
+        timings.update(get_stt_timings())
+    print(f"📝 Transcript: {text}")
+    print(f"   (archived: {turn.get('transcript', '')})")
+
+    if not text or not text.strip():
+        print("⚠️  Empty transcript, stopping replay")
+        return
+
+    start = time.perf_counter()
+    answer = ask_llm(text)
+    timings["llm"] = time.perf_counter() - start
+    print(f"💬 LLM: {answer}")
+    print(f"   (archived: {turn.get('llm_response', '')})")
+
+    if not args.no_speak:
+        start = time.perf_counter()
+        text_to_speech(prepare_reply(answer))
+        timings["tts"] = time.perf_counter() - start
+
+    print("\n⏱️  Stage timings (replay vs archived):")
+    stages = list(timings)
+    if "stt/record" in archived_timings and "stt/record" not in stages:
+        stages.insert(0, "stt/record")
+    for stage in stages:
+        seconds = timings.get(stage)
+        archived = archived_timings.get(stage)
+        seconds_str = f"{seconds:.2f}s" if seconds is not None else "-"
+        archived_str = f"{archived:.2f}s" if archived is not None else "-"
+        print(f"   {stage:<14} {seconds_str:>8}   {archived_str:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turn capture archive tools")
+    parser.add_argument("--dir", default=TURN_CAPTURE_DIR, help="Archive directory (default: TURN_CAPTURE_DIR)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="List archived turns")
+
+    show = sub.add_parser("show", help="Show one archived turn")
+    show.add_argument("turn_id", type=int)
+
+    replay = sub.add_parser("replay", help="Replay one turn through STT, LLM and TTS")
+    replay.add_argument("turn_id", type=int)
+    replay.add_argument("--no-speak", action="store_true", help="Skip TTS")
+    replay.add_argument("--archived-transcript", action="store_true", help="Skip STT, use archived transcript")
+
+    args = parser.parse_args()
+    if not args.dir:
+        print("❌ Set TURN_CAPTURE_DIR atau gunakan --dir")
+        sys.exit(1)
+
+    archive = TurnArchive(args.dir)
+    {"list": cmd_list, "show": cmd_show, "replay": cmd_replay}[args.command](archive, args)
+
+
+if __name__ == "__main__":
+    main()
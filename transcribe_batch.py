@@ -0,0 +1,185 @@
+"""
+Batch transcription WAV files dengan prompt & settings Whisper yang sama
+seperti live STT.
+
+N worker process masing-masing load model sekali. Hasil ditulis ke JSONL
+sesuai urutan selesai, dan file yang sudah sukses di-skip saat dijalankan
+ulang (resume).
+
+Usage:
+    python transcribe_batch.py recordings/ -o results.jsonl -w 4
+    python transcribe_batch.py manifest.txt -o results.jsonl
+    python transcribe_batch.py recordings/ --profile profiles/batch
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.util import Finalize
+
+from config.config import PROFILE_DIR
+# Import duluan: whisper_backend set warnings filter sebelum load whisper
+from helpers.whisper_backend import WHISPER_MODEL, load_whisper_model, transcribe
+
+import whisper
+from helpers.profiler import start_profiler, stop_profiler, profile_turn, profile_stage
+from helpers.cpu_budget import apply_cpu_budget, available_cores
+
+AUDIO_EXTENSIONS = (".wav",)
+
+# Model per worker process (load sekali di initializer)
+_worker_model = None
+
+
+def _init_worker(model_name, torch_threads, profile_dir=None):
+    global _worker_model
+    # Bagi core rata antar worker (bukan semua core per worker); batch tidak
+    # punya audio callback, jadi tidak ada core yang disisihkan / di-pin
+    apply_cpu_budget(torch_intra=torch_threads, reserve_audio=False)
+    if profile_dir:
+        # Satu profiler per worker; ditulis saat worker process exit
+        start_profiler(os.path.join(profile_dir, f"worker-{os.getpid()}"))
+        Finalize(None, stop_profiler, exitpriority=10)
+    with profile_stage("load_model"):
+        _worker_model = load_whisper_model(model_name)
+
+
+def _transcribe_file(index, path):
+    """Jalan di worker: load audio, transcribe, return record JSONL"""
+    start = time.perf_counter()
+    profile_turn(index)
+    try:
+        with profile_stage("load_audio"):
+            audio = whisper.load_audio(path)
+        with profile_stage("whisper"):
+            text = transcribe(_worker_model, audio)
+        return {
+            "path": path,
+            "text": text.strip(),
+            "duration": len(audio) / whisper.audio.SAMPLE_RATE,
+            "elapsed": time.perf_counter() - start,
+            "worker": os.getpid(),
+        }
+    except Exception as e:
+        return {
+            "path": path,
+            "error": str(e),
+            "elapsed": time.perf_counter() - start,
+            "worker": os.getpid(),
+        }
+
+
+def collect_inputs(source):
+    """Directory (recursive .wav) atau manifest (satu path per baris / JSONL dengan "path")"""
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.lower().endswith(AUDIO_EXTENSIONS):
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = json.loads(line)["path"] if line.startswith("{") else line
+            paths.append(path if os.path.isabs(path) else os.path.join(base, path))
+    return paths
+
+
+def load_completed(output_path):
+    """Path yang sudah sukses di output JSONL (untuk resume)"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Baris terakhir terpotong saat interrupt
+                continue
+            if "error" not in record:
+                completed.add(record["path"])
+    return completed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch Whisper transcription")
+    parser.add_argument("source", help="Directory WAV atau manifest file")
+    parser.add_argument("-o", "--output", default="transcripts.jsonl", help="Output JSONL")
+    parser.add_argument("-w", "--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Jumlah worker process")
+    parser.add_argument("--model", default=WHISPER_MODEL, help="Whisper model (default: WHISPER_MODEL)")
+    parser.add_argument("--no-resume", action="store_true", help="Proses ulang semua file")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_DIR, metavar="DIR",
+                        help="Sampling profiler per worker (collapsed stacks per stage & file)")
+    args = parser.parse_args()
+
+    paths = collect_inputs(args.source)
+    if args.no_resume and os.path.exists(args.output):
+        os.remove(args.output)
+    completed = load_completed(args.output)
+    todo = [path for path in paths if path not in completed]
+
+    print(f"📂 {len(paths)} files, {len(paths) - len(todo)} done, {len(todo)} to transcribe "
+          f"({args.workers} workers, model {args.model})")
+    if not todo:
+        return
+
+    total_audio = 0.0
+    total_busy = 0.0
+    done = 0
+    failed = 0
+    start = time.perf_counter()
+
+    # spawn: torch tidak aman di-fork setelah thread pool-nya jalan
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(args.model, max(1, len(available_cores()) // args.workers), args.profile),
+    )
+    try:
+        with open(args.output, "a", encoding="utf-8") as out:
+            futures = [pool.submit(_transcribe_file, index, path) for index, path in enumerate(todo)]
+            for future in as_completed(futures):
+                record = future.result()
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+
+                done += 1
+                total_busy += record["elapsed"]
+                if "error" in record:
+                    failed += 1
+                    print(f"❌ [{done}/{len(todo)}] {record['path']}: {record['error']}")
+                else:
+                    total_audio += record["duration"]
+                    print(f"✅ [{done}/{len(todo)}] {record['path']} "
+                          f"({record['duration']:.1f}s audio, {record['elapsed']:.1f}s)")
+    except KeyboardInterrupt:
+        # Jangan tunggu file yang masih antri (hasilnya dibuang), resume saat run berikutnya
+        pool.shutdown(wait=False, cancel_futures=True)
+        print("\n🛑 Interrupted, jalankan ulang untuk resume")
+        sys.exit(130)
+    pool.shutdown()
+
+    wall = time.perf_counter() - start
+    print("=" * 70)
+    print(f"📊 {done - failed} ok, {failed} failed in {wall:.1f}s")
+    if total_audio > 0:
+        print(f"⏱️  Real-time factor: {wall / total_audio:.3f} (wall), "
+              f"{total_busy / total_audio:.3f} (per worker)")
+    print(f"🚀 Throughput: {done / wall:.2f} files/s, {total_audio / wall:.1f}s audio/s")
+
+
+if __name__ == "__main__":
+    main()